@@ -0,0 +1,39 @@
+"""Scaling of `decomposition` in the number of runs."""
+
+import numpy as np
+
+import simdec as sd
+
+
+class Decomposition:
+    """4 variables with 3 states each, 81 scenarios."""
+
+    params = ([10**4, 10**5, 10**6, 10**7], ["mean", "median"])
+    param_names = ["n_runs", "statistic"]
+    timeout = 600
+
+    def setup(self, n_runs, statistic):
+        rng = np.random.default_rng(1234)
+        self.inputs = rng.random((n_runs, 4))
+        self.output = self.inputs @ [4, 3, 2, 1]
+        self.si = np.array([0.4, 0.3, 0.2, 0.1])
+
+    def time_decomposition(self, n_runs, statistic):
+        sd.decomposition(
+            inputs=self.inputs,
+            output=self.output,
+            sensitivity_indices=self.si,
+            states=[3, 3, 3, 3],
+            dec_limit=1,
+            statistic=statistic,
+        )
+
+    def peakmem_decomposition(self, n_runs, statistic):
+        sd.decomposition(
+            inputs=self.inputs,
+            output=self.output,
+            sensitivity_indices=self.si,
+            states=[3, 3, 3, 3],
+            dec_limit=1,
+            statistic=statistic,
+        )
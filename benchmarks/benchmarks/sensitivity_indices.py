@@ -0,0 +1,103 @@
+"""Scaling of `sensitivity_indices` in the number of runs and factors."""
+
+import pathlib
+
+import numpy as np
+import pandas as pd
+
+import simdec as sd
+
+path_data = pathlib.Path(__file__).parents[2] / "tests" / "data"
+
+
+def f_ishigami(x):
+    return np.sin(x[0]) + 7 * np.sin(x[1]) ** 2 + 0.1 * (x[2] ** 4) * np.sin(x[0])
+
+
+def linear_interactions(x):
+    """Weighted sum of the factors with an interaction between consecutive ones."""
+    weights = 1 / np.arange(1, len(x) + 1)
+    return weights @ x + weights[:-1] @ (x[:-1] * x[1:])
+
+
+class Ishigami:
+    params = ([10**3, 10**4, 10**5, 10**6, 10**7], ["numpy", "numba"])
+    param_names = ["n_runs", "backend"]
+    timeout = 600
+
+    def setup(self, n_runs, backend):
+        if sd.set_backend(backend).name != backend:
+            raise NotImplementedError(f"backend '{backend}' is not available")
+        rng = np.random.default_rng(1234)
+        self.inputs = rng.uniform(-np.pi, np.pi, size=(n_runs, 3))
+        self.output = f_ishigami(self.inputs.T)
+        # compilation and first call overheads
+        sd.sensitivity_indices(inputs=self.inputs[:100], output=self.output[:100])
+        # time the computation of the second-order effects, not their lookup
+        sd.set_soe_cache(0)
+
+    def teardown(self, n_runs, backend):
+        sd.set_backend("numpy")
+        sd.set_soe_cache()
+
+    def time_sensitivity_indices(self, n_runs, backend):
+        sd.sensitivity_indices(inputs=self.inputs, output=self.output)
+
+    def peakmem_sensitivity_indices(self, n_runs, backend):
+        sd.sensitivity_indices(inputs=self.inputs, output=self.output)
+
+
+class Factors:
+    params = ([3, 10, 30, 100, 200], [10**3, 10**4])
+    param_names = ["n_factors", "n_runs"]
+    timeout = 600
+
+    def setup(self, n_factors, n_runs):
+        rng = np.random.default_rng(1234)
+        self.inputs = rng.random((n_runs, n_factors))
+        self.output = linear_interactions(self.inputs.T)
+        sd.set_soe_cache(0)
+
+    def teardown(self, n_factors, n_runs):
+        sd.set_soe_cache()
+
+    def time_sensitivity_indices(self, n_factors, n_runs):
+        sd.sensitivity_indices(inputs=self.inputs, output=self.output)
+
+    def peakmem_sensitivity_indices(self, n_factors, n_runs):
+        sd.sensitivity_indices(inputs=self.inputs, output=self.output)
+
+
+class Selection:
+    """Removing one of 40 factors with the second-order effects cached."""
+
+    params = [10**4, 10**5]
+    param_names = ["n_runs"]
+    timeout = 600
+
+    def setup(self, n_runs):
+        rng = np.random.default_rng(1234)
+        self.inputs = rng.random((n_runs, 40))
+        self.output = linear_interactions(self.inputs.T)
+        sd.set_soe_cache()
+        sd.sensitivity_indices(inputs=self.inputs, output=self.output)
+
+    def time_remove_factor(self, n_runs):
+        sd.sensitivity_indices(inputs=self.inputs[:, 1:], output=self.output)
+
+
+class Stress:
+    def setup(self):
+        data = pd.read_csv(path_data / "stress.csv")
+        output_name, *v_names = list(data.columns)
+        self.inputs, self.output = data[v_names], data[output_name]
+        sd.set_soe_cache(0)
+
+    def teardown(self):
+        sd.set_soe_cache()
+
+    def time_sensitivity_indices(self):
+        sd.sensitivity_indices(inputs=self.inputs, output=self.output)
+
+    def peakmem_sensitivity_indices(self):
+        sd.sensitivity_indices(inputs=self.inputs, output=self.output)
@@ -202,6 +202,21 @@ def decomposition_(dec_limit, si, inputs, output):
     )
 
 
+@pn.cache
+def two_output_decomposition_(dec_limit, si, inputs, output, output_2):
+    if output_2 is None:
+        return None
+    # both outputs share the scenarios, the inputs are binned once
+    return decomposition_(dec_limit, si, inputs, np.column_stack([output, output_2]))
+
+
+def single_output_decomposition_(dec_limit, si, inputs, output, output_2):
+    res = two_output_decomposition_(dec_limit, si, inputs, output, output_2)
+    if res is not None:
+        return res.select_output(0)
+    return decomposition_(dec_limit, si, inputs, output)
+
+
 @pn.cache
 def base_colors(res):
     colors = []
@@ -240,9 +255,9 @@ def palette_(states: list[list[str]], colors_picked: list[list[float]]):
 
 @pn.cache
 def n_bins_auto(res):
-    min_ = np.nanmin(res.bins)
-    max_ = np.nanmax(res.bins)
-    return len(np.histogram_bin_edges(res.bins, bins="auto", range=(min_, max_))) - 1
+    min_ = np.nanmin(res.output)
+    max_ = np.nanmax(res.output)
+    return len(np.histogram_bin_edges(res.output, bins="auto", range=(min_, max_))) - 1
 
 
 def display_n_bins(kind):
@@ -269,15 +284,14 @@ def figure_pn(
 
         kind = "histogram" if kind == "Stacked histogram" else "boxplot"
         _ = sd.visualization(
-            bins=res.bins.copy(), palette=palette, n_bins=n_bins, kind=kind, ax=ax
+            decomposition=res, palette=palette, n_bins=n_bins, kind=kind, ax=ax
         )
         ax.set(xlabel=output_name)
         if xlim is not None:
             ax.set_xlim(xlim)
     else:
         fig, _ = sd.two_output_visualization(
-            bins=res.bins,
-            bins2=res2.bins,
+            decomposition=res2,
             palette=palette,
             n_bins=n_bins,
             output_name=output_name,
@@ -302,8 +316,8 @@ def tableau_pn(res, states, palette):
         statistic=res.statistic,
         var_names=res.var_names,
         states=res.states,
-        bins=res.bins,
         palette=palette[::-1],  # reverse to match the order in the figure
+        decomposition=res,
     )
     return styler
 
@@ -414,14 +428,6 @@ indicator_explained_variance = pn.indicators.Number(
 )
 
 
-interactive_decomposition = pn.bind(
-    decomposition_,
-    interactive_explained_variance,
-    interactive_filtered_si,
-    interactive_inputs_decomposition,
-    interactive_output,
-)
-
 switch_type_visualization = pn.widgets.RadioButtonGroup(
     name="Type of visualization",
     options=["Stacked histogram", "Boxplot", "2 outputs"],
@@ -437,29 +443,21 @@ selector_2_output = pn.widgets.Select(
 )
 interactive_2_output = pn.bind(filtered_data, interactive_file, selector_2_output)
 
-interactive_sensitivity_indices_full_2 = pn.bind(
-    sensitivity_indices_full, interactive_inputs, interactive_2_output
-)
-interactive_sensitivity_indices_2 = pn.bind(
-    sensitivity_indices, interactive_sensitivity_indices_full_2
-)
-interactive_explained_variance_2 = pn.bind(
-    explained_variance, interactive_sensitivity_indices_2
-)
-
-interactive_sensitivity_indices_table_2 = pn.bind(
-    sensitivity_indices_table, interactive_sensitivity_indices_2, interactive_inputs
-)
-
-interactive_filtered_si_2 = pn.bind(
-    filtered_si, interactive_sensitivity_indices_table_2, selector_inputs_decomposition
+interactive_decomposition_2 = pn.bind(
+    two_output_decomposition_,
+    interactive_explained_variance,
+    interactive_filtered_si,
+    interactive_inputs_decomposition,
+    interactive_output,
+    interactive_2_output,
 )
 
-interactive_decomposition_2 = pn.bind(
-    decomposition_,
-    interactive_explained_variance_2,
-    interactive_filtered_si_2,
+interactive_decomposition = pn.bind(
+    single_output_decomposition_,
+    interactive_explained_variance,
+    interactive_filtered_si,
     interactive_inputs_decomposition,
+    interactive_output,
     interactive_2_output,
 )
 
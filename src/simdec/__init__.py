@@ -1,16 +1,32 @@
 """SimDec main namespace."""
+
+from simdec.backends import *
+from simdec.cache import *
 from simdec.decomposition import *
 from simdec.heterogeneity_indices import *
+from simdec.profiling import *
 from simdec.sensitivity_indices import *
+from simdec.streaming import *
 from simdec.visualization import *
 
 __all__ = [
     "sensitivity_indices",
+    "sensitivity_indices_streaming",
+    "SensitivityStatistics",
+    "SensitivityAccumulator",
     "states_expansion",
     "decomposition",
+    "ScenarioIndexer",
+    "decomposition_streaming",
+    "ScenarioStatistics",
     "visualization",
     "two_output_visualization",
     "tableau",
     "palette",
     "heterogeneity_indices",
+    "set_backend",
+    "get_backend",
+    "set_profile_hook",
+    "set_soe_cache",
+    "ResultCache",
 ]
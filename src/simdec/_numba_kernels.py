@@ -0,0 +1,79 @@
+"""Numba kernels of the ``"numba"`` backend, see `simdec.backends`.
+
+Accumulation loops are written out in each kernel: going through a helper
+function prevents LLVM from optimizing the scattered additions.
+"""
+
+import numba
+import numpy as np
+
+kernel = numba.njit(cache=True, nogil=True)
+
+
+@kernel
+def code_of(v, edges, factor, positive, last_rounded):
+    """`np.digitize` with the rightmost edge rule of `_bin_codes`."""
+    n_edges = edges.shape[0]
+    if np.isnan(v):
+        return n_edges - 1
+    # equal-width guess corrected into the number of edges <= v
+    code = (v - edges[0]) / (edges[-1] - edges[0]) * (n_edges - 1)
+    code = min(max(code, 0.0), n_edges - 1.0)
+    code = np.intp(code)
+    while code < n_edges and edges[code] <= v:
+        code += 1
+    while code > 0 and edges[code - 1] > v:
+        code -= 1
+    if v >= edges[-1]:
+        # same operations as np.around
+        if positive:
+            rounded = np.rint(v * factor) / factor
+        else:
+            rounded = np.rint(v / factor) * factor
+        if rounded == last_rounded:
+            code -= 1
+    return code - 1
+
+
+@kernel
+def codes_kernel(x, edges, factor, positive, last_rounded, codes):
+    for r in range(x.shape[0]):
+        codes[r] = code_of(x[r], edges, factor, positive, last_rounded)
+
+
+@kernel
+def statistics_kernel(codes, output, counts, sums):
+    n_bins, n_outputs = sums.shape
+    for r in range(codes.shape[0]):
+        code = np.intp(codes[r])
+        if code >= 0 and code < n_bins:
+            counts[code] += 1
+            for o in range(n_outputs):
+                sums[code, o] += output[r, o]
+
+
+@kernel
+def binned_kernel(
+    x, edges, factor, positive, last_rounded, output, codes, counts, sums
+):
+    n_bins, n_outputs = sums.shape
+    for r in range(x.shape[0]):
+        code = code_of(x[r], edges, factor, positive, last_rounded)
+        codes[r] = code
+        if code >= 0 and code < n_bins:
+            counts[code] += 1
+            for o in range(n_outputs):
+                sums[code, o] += output[r, o]
+
+
+@kernel
+def pair_kernel(codes_i, codes_j, n_bins, output, counts, sums):
+    n_outputs = sums.shape[1]
+    for r in range(codes_i.shape[0]):
+        code_i = np.intp(codes_i[r])
+        code_j = np.intp(codes_j[r])
+        if code_i >= 0 and code_i < n_bins and code_j >= 0 and code_j < n_bins:
+            code = code_i * n_bins + code_j
+            counts[code] += 1
+            for o in range(n_outputs):
+                sums[code, o] += output[r, o]
@@ -0,0 +1,224 @@
+from dataclasses import dataclass
+from typing import Callable, Literal
+import warnings
+
+import numpy as np
+from scipy import sparse
+
+
+__all__ = ["set_backend", "get_backend"]
+
+
+@dataclass(frozen=True)
+class Backend:
+    """Binning kernels used by the sensitivity analysis.
+
+    Codes are zero-based bin indices, counts of shape (n_bins,) and sums of
+    shape (n_bins, n_outputs). Values beyond the edges have codes outside of
+    [0, n_bins), which are not counted.
+
+    Attributes
+    ----------
+    name : str
+        Name of the backend.
+    bin_codes : callable
+        ``bin_codes(x, edges) -> codes``.
+    bin_statistics : callable
+        ``bin_statistics(codes, output, n_bins) -> (counts, sums)``.
+    binned_statistics : callable
+        ``binned_statistics(x, edges, output) -> (codes, counts, sums)``.
+    pair_statistics : callable
+        ``pair_statistics(codes_i, codes_j, n_bins, output) -> (counts, sums)``
+        on the joint n_bins x n_bins grid.
+
+    """
+
+    name: str
+    bin_codes: Callable
+    bin_statistics: Callable
+    binned_statistics: Callable
+    pair_statistics: Callable
+
+
+def _edge_decimal(edges: np.ndarray) -> int:
+    """Rounding precision used to detect values on the rightmost edge."""
+    return int(-np.log10(np.diff(edges).min())) + 6
+
+
+# Runs digitized at once, bounds the intp temporaries of `np.digitize`
+_BLOCK_SIZE = 2**18
+
+
+def _bin_codes(x: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Zero-based bin index of each sample of `x`.
+
+    Values on the rightmost edge belong to the last bin, as in
+    `scipy.stats.binned_statistic`. Codes use the smallest unsigned dtype.
+    """
+    codes = np.empty(len(x), dtype=np.min_scalar_type(len(edges)))
+
+    decimal = _edge_decimal(edges)
+    last_rounded = np.around(edges[-1], decimal)
+    for start in range(0, len(x), _BLOCK_SIZE):
+        x_block = x[start : start + _BLOCK_SIZE]
+        codes_block = np.digitize(x_block, edges)
+
+        # only round the values beyond the rightmost edge
+        beyond = np.flatnonzero(x_block >= edges[-1])
+        on_edge = beyond[np.around(x_block[beyond], decimal) == last_rounded]
+        codes_block[on_edge] -= 1
+        codes_block -= 1
+        codes[start : start + _BLOCK_SIZE] = codes_block
+
+    return codes
+
+
+def _bin_sums(codes: np.ndarray, output: np.ndarray, n_bins: int) -> np.ndarray:
+    """Sum of each output column in each bin, shape (n_bins, n_outputs).
+
+    All outputs are reduced in a single pass as a product with the one-hot
+    encoding of the codes.
+    """
+    if output.shape[1] == 1:
+        sums = np.bincount(codes, weights=output[:, 0], minlength=n_bins)
+        return sums[:, np.newaxis]
+
+    n_runs = codes.shape[0]
+    onehot = sparse.csr_array(
+        (np.ones(n_runs), codes, np.arange(n_runs + 1)), shape=(n_runs, n_bins)
+    )
+    return onehot.T @ output
+
+
+def _bin_statistics(
+    codes: np.ndarray, output: np.ndarray, n_bins: int
+) -> tuple[np.ndarray, np.ndarray]:
+    # unsigned codes of values below the first edge wrap around
+    inside = codes < n_bins
+    if not inside.all():
+        codes, output = codes[inside], output[inside]
+    counts = np.bincount(codes, minlength=n_bins)
+    return counts, _bin_sums(codes, output, n_bins)
+
+
+def _binned_statistics(
+    x: np.ndarray, edges: np.ndarray, output: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    codes = _bin_codes(x, edges)
+    return codes, *_bin_statistics(codes, output, len(edges) - 1)
+
+
+def _pair_statistics(
+    codes_i: np.ndarray, codes_j: np.ndarray, n_bins: int, output: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    codes_ij = codes_i.astype(np.intp) * n_bins + codes_j
+    # a code beyond the edges would alias a cell of the grid
+    codes_ij[(codes_i >= n_bins) | (codes_j >= n_bins)] = n_bins**2
+    return _bin_statistics(codes_ij, output, n_bins**2)
+
+
+def _numpy_backend() -> Backend:
+    return Backend(
+        name="numpy",
+        bin_codes=_bin_codes,
+        bin_statistics=_bin_statistics,
+        binned_statistics=_binned_statistics,
+        pair_statistics=_pair_statistics,
+    )
+
+
+def _numba_backend() -> Backend:
+    """Kernels fusing digitize, count and sum in a single pass over the runs.
+
+    Codes follow `np.digitize` and the rounding of `np.around` so that they
+    are identical to the NumPy backend. Sums are accumulated in run order.
+    """
+    from simdec import _numba_kernels as kernels
+
+    def rounding(x, edges):
+        # same operands as np.around: x * 10**d or x / 10**-d in x's dtype
+        decimal = _edge_decimal(edges)
+        factor = x.dtype.type(10.0 ** abs(decimal))
+        last_rounded = np.around(edges[-1].astype(x.dtype), decimal)
+        return factor, decimal >= 0, last_rounded
+
+    def as_float(x):
+        return x if np.issubdtype(x.dtype, np.floating) else x.astype(float)
+
+    def empty_statistics(n_bins, output):
+        counts = np.zeros(n_bins, dtype=np.intp)
+        sums = np.zeros((n_bins, output.shape[1]))
+        return counts, sums
+
+    def bin_codes(x, edges):
+        x = as_float(np.asarray(x))
+        codes = np.empty(len(x), dtype=np.min_scalar_type(len(edges)))
+        kernels.codes_kernel(x, edges, *rounding(x, edges), codes)
+        return codes
+
+    def bin_statistics(codes, output, n_bins):
+        counts, sums = empty_statistics(n_bins, output)
+        kernels.statistics_kernel(codes, output, counts, sums)
+        return counts, sums
+
+    def binned_statistics(x, edges, output):
+        x = as_float(np.asarray(x))
+        codes = np.empty(len(x), dtype=np.min_scalar_type(len(edges)))
+        counts, sums = empty_statistics(len(edges) - 1, output)
+        kernels.binned_kernel(
+            x, edges, *rounding(x, edges), output, codes, counts, sums
+        )
+        return codes, counts, sums
+
+    def pair_statistics(codes_i, codes_j, n_bins, output):
+        counts, sums = empty_statistics(n_bins**2, output)
+        kernels.pair_kernel(codes_i, codes_j, n_bins, output, counts, sums)
+        return counts, sums
+
+    return Backend(
+        name="numba",
+        bin_codes=bin_codes,
+        bin_statistics=bin_statistics,
+        binned_statistics=binned_statistics,
+        pair_statistics=pair_statistics,
+    )
+
+
+_BACKENDS = {"numpy": _numpy_backend, "numba": _numba_backend}
+_backend = _numpy_backend()
+
+
+def set_backend(name: Literal["numpy", "numba"]) -> Backend:
+    """Select the compute backend of the binning kernels.
+
+    Parameters
+    ----------
+    name : {"numpy", "numba"}
+        ``"numba"`` compiles kernels fusing digitize, count and sum in a
+        single pass over each input column. It requires the optional
+        dependency `numba` and falls back to ``"numpy"`` with a warning if
+        it is not installed.
+
+    Returns
+    -------
+    backend : Backend
+        The active backend.
+
+    """
+    global _backend
+    if name not in _BACKENDS:
+        raise ValueError(f"'name' can only be one of {list(_BACKENDS)}")
+    try:
+        _backend = _BACKENDS[name]()
+    except ImportError:
+        warnings.warn(
+            f"The '{name}' backend is not available, falling back to 'numpy'.",
+            stacklevel=2,
+        )
+        _backend = _numpy_backend()
+    return _backend
+
+
+def get_backend() -> Backend:
+    """Active compute backend, see `set_backend`."""
+    return _backend
@@ -0,0 +1,388 @@
+"""Content-addressed cache of analysis results.
+
+Results are keyed by a hash of the buffers of the inputs and output and of
+the parameters of the call. A memory tier keeps the most recent results and
+a disk tier, bounded in size, persists them across sessions::
+
+    import simdec as sd
+
+    res = sd.cache.sensitivity_indices(inputs=inputs, output=output)
+
+"""
+
+from collections import OrderedDict
+from collections.abc import Callable
+import copyreg
+import dataclasses
+import functools
+from hashlib import blake2b
+import importlib.metadata
+import inspect
+import io
+import os
+import pathlib
+import pickle
+import tempfile
+import threading
+import time
+from typing import Any
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from simdec.decomposition import DecompositionResult
+from simdec.decomposition import decomposition as decomposition_
+from simdec.ingestion import _as_columns, _as_output, _library
+from simdec.sensitivity_indices import (
+    SensitivityAnalysisResult,
+    _print_indices,
+)
+from simdec.sensitivity_indices import sensitivity_indices as sensitivity_indices_
+
+
+__all__ = ["ResultCache"]
+
+
+# Digests of read-only arrays, e.g. memory mapped files, by identity
+_array_digests = {}
+
+# Types whose representation identifies their value
+_repr_types = (
+    type(None),
+    bool,
+    int,
+    float,
+    complex,
+    str,
+    bytes,
+    range,
+    slice,
+    np.generic,
+    np.dtype,
+)
+
+
+def _version() -> str:
+    """Version of the package, results of a source tree are not versioned."""
+    try:
+        return importlib.metadata.version("simdec")
+    except importlib.metadata.PackageNotFoundError:
+        return "source"
+
+
+def _is_read_only(array: np.ndarray) -> bool:
+    while isinstance(array, np.ndarray):
+        if array.flags.writeable:
+            return False
+        array = array.base
+    return True
+
+
+def _array_digest(array: np.ndarray) -> bytes:
+    """Hash of the raw buffer of `array`, memoized if it is read-only."""
+    key = id(array)
+    if key in _array_digests:
+        return _array_digests[key][1]
+
+    h = blake2b(digest_size=20)
+    h.update(np.ascontiguousarray(array).data)
+    digest = h.digest()
+    if _is_read_only(array):
+        ref = weakref.ref(array, lambda _: _array_digests.pop(key, None))
+        _array_digests[key] = (ref, digest)
+    return digest
+
+
+def _update_hash(h: Any, obj: Any) -> None:
+    """Feed `obj` to the hash `h`, arrays through their raw buffer."""
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.hasobject:
+            _update_hash(h, pd.Series(obj.ravel()))
+        else:
+            h.update(f"ndarray{obj.dtype.str}{obj.shape}".encode())
+            h.update(_array_digest(obj))
+    elif isinstance(obj, pd.DataFrame):
+        h.update(f"DataFrame{obj.shape}".encode())
+        for name, column in obj.items():
+            _update_hash(h, name)
+            _update_hash(h, column)
+    elif isinstance(obj, pd.Index):
+        _update_hash(h, pd.Series(obj, copy=False))
+    elif isinstance(obj, pd.Series):
+        h.update(f"Series{obj.name!r}{obj.dtype}".encode())
+        if isinstance(obj.dtype, np.dtype) and not obj.dtype.hasobject:
+            _update_hash(h, obj.to_numpy())
+        else:
+            # categorical, string or object values
+            values = pd.util.hash_pandas_object(obj, index=False).to_numpy()
+            _update_hash(h, values)
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"{type(obj).__name__}{len(obj)}".encode())
+        for item in obj:
+            _update_hash(h, item)
+    elif isinstance(obj, dict):
+        h.update(f"dict{len(obj)}".encode())
+        for key, value in obj.items():
+            _update_hash(h, key)
+            _update_hash(h, value)
+    elif isinstance(obj, os.PathLike) or (isinstance(obj, str) and os.path.isfile(obj)):
+        # data files are identified by their path, size and modification time
+        path = pathlib.Path(obj).resolve()
+        stat = path.stat()
+        h.update(f"Path{path}{stat.st_size}{stat.st_mtime_ns}".encode())
+    elif isinstance(obj, np.random.Generator):
+        h.update(repr(obj.bit_generator.state).encode())
+    elif _library(obj) in {"pyarrow", "polars"}:
+        # the representation of tables is truncated, hash their columns
+        if hasattr(obj, "column_names") or hasattr(obj, "columns"):
+            columns = _as_columns(obj, prefix=None)
+            h.update(f"Table{columns.n_runs}".encode())
+            _update_hash(h, columns.names)
+            _update_hash(h, [np.asarray(column) for column in columns.data])
+            _update_hash(h, columns.categories)
+        else:
+            _update_hash(h, _as_output(obj)[0])
+    elif hasattr(obj, "dist") and hasattr(obj, "args") and hasattr(obj, "kwds"):
+        # frozen distributions of `scipy.stats`, their repr has an address
+        h.update(f"Distribution{obj.dist.name}".encode())
+        _update_hash(h, obj.args)
+        _update_hash(h, obj.kwds)
+    elif type(obj).__module__.startswith("simdec.") and hasattr(obj, "__dict__"):
+        # e.g. a fitted `ScenarioIndexer`
+        h.update(type(obj).__qualname__.encode())
+        _update_hash(h, vars(obj))
+    elif isinstance(obj, _repr_types):
+        h.update(f"{type(obj).__name__}{obj!r}".encode())
+    else:
+        raise TypeError(f"Cannot hash an argument of type {type(obj).__name__!r}")
+
+
+# Parameters which only control what a call displays, not its result
+_DISPLAY_ARGUMENTS = ("print_indices",)
+
+
+def _arguments(func: Callable, *args, **kwargs) -> dict:
+    """Arguments of a call of `func` by parameter name, defaults included."""
+    arguments = inspect.signature(func).bind(*args, **kwargs)
+    arguments.apply_defaults()
+    return dict(arguments.arguments)
+
+
+def _replay(arguments: dict, res: Any) -> None:
+    """Display a result loaded from the cache as the call would have."""
+    if isinstance(res, SensitivityAnalysisResult) and arguments.get("print_indices"):
+        var_names = _as_columns(arguments["inputs"]).names
+        output_names = _as_output(arguments["output"])[1]
+        n_factors = len(var_names)
+        _print_indices(
+            np.reshape(res.si, (-1, n_factors)),
+            np.reshape(res.first_order, (-1, n_factors)),
+            np.reshape(res.second_order, (-1, n_factors, n_factors)),
+            var_names,
+            output_names,
+            np.ndim(res.si) == 2,
+        )
+
+
+def _pickle_dataclass(obj: Any) -> tuple:
+    values = [getattr(obj, field.name) for field in dataclasses.fields(obj)]
+    return type(obj), tuple(values)
+
+
+# `DecompositionResult.__reduce__` returns a hash for the dashboard's cache
+_dispatch_table = copyreg.dispatch_table.copy()
+_dispatch_table[DecompositionResult] = _pickle_dataclass
+
+
+def _dumps(obj: Any) -> bytes:
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL)
+    pickler.dispatch_table = _dispatch_table
+    pickler.dump(obj)
+    return buffer.getvalue()
+
+
+def _touch(path: pathlib.Path) -> None:
+    """Mark `path` as recently used, finer than the file system's clock."""
+    now = time.time_ns()
+    os.utime(path, ns=(now, now))
+
+
+class ResultCache:
+    """Two-tier least recently used cache of analysis results.
+
+    Parameters
+    ----------
+    directory : str or Path, optional
+        Directory of the disk tier. Defaults to the environment variable
+        ``SIMDEC_CACHE_DIR`` or ``~/.cache/simdec``.
+    max_bytes : int, default 2**30
+        Size of the disk tier. The least recently used results are evicted
+        beyond it. 0 disables the disk tier.
+    max_items : int, default 32
+        Number of results kept in memory. 0 disables the memory tier.
+
+    Notes
+    -----
+    Keys hash the whole buffers of the data. The hash of read-only arrays,
+    such as memory mapped ``.npy`` files, is computed once per array object:
+    they are assumed not to change. Data files given as `pathlib.Path` are
+    identified by their path, size and modification time, not their content.
+    Calls with arguments which cannot be identified by their value, e.g.
+    arbitrary objects, are not cached.
+
+    Examples
+    --------
+    >>> import simdec as sd
+    >>> cache = sd.ResultCache(directory="simdec_cache")
+    >>> sensitivity_indices = cache.cached(sd.sensitivity_indices)
+
+    The first call computes and stores the result, following calls with the
+    same data and parameters load it back:
+
+    >>> res = sensitivity_indices(inputs=inputs, output=output)  # doctest: +SKIP
+
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike | None = None,
+        max_bytes: int = 2**30,
+        max_items: int = 32,
+    ):
+        if directory is None:
+            directory = os.environ.get(
+                "SIMDEC_CACHE_DIR", pathlib.Path.home() / ".cache" / "simdec"
+            )
+        self.directory = pathlib.Path(directory)
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, func: Callable, *args, **kwargs) -> str:
+        """Hash of the package version, `func` and its bound arguments.
+
+        Raises a TypeError for arguments which cannot be identified by their
+        value.
+        """
+        arguments = _arguments(func, *args, **kwargs)
+        for name in _DISPLAY_ARGUMENTS:
+            arguments.pop(name, None)
+
+        h = blake2b(digest_size=20)
+        _update_hash(h, _version())
+        _update_hash(h, f"{func.__module__}.{func.__qualname__}")
+        _update_hash(h, arguments)
+        return h.hexdigest()
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.directory / f"{key}.pkl"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Result stored under `key`, from memory then from disk."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+        if self.max_bytes > 0:
+            path = self._path(key)
+            try:
+                with path.open("rb") as f:
+                    value = pickle.load(f)
+                _touch(path)
+            except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+                return default
+            self._remember(key, value)
+            return value
+        return default
+
+    def set(self, key: str, value: Any) -> None:
+        """Store `value` under `key` in memory and on disk."""
+        self._remember(key, value)
+        if self.max_bytes > 0:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # atomic write, concurrent readers never see a partial file
+            with tempfile.NamedTemporaryFile(
+                dir=self.directory, suffix=".tmp", delete=False
+            ) as f:
+                f.write(_dumps(value))
+            os.replace(f.name, self._path(key))
+            _touch(self._path(key))
+            self._evict()
+
+    def _remember(self, key: str, value: Any) -> None:
+        if self.max_items <= 0:
+            return
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+    def _evict(self) -> None:
+        """Remove the least recently used files beyond `max_bytes`."""
+        files = []
+        for path in self.directory.glob("*.pkl"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(file_size for _, file_size, _ in files)
+        for _, file_size, path in sorted(files, key=lambda file: file[0]):
+            if size <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            size -= file_size
+
+    def clear(self) -> None:
+        """Empty both tiers."""
+        with self._lock:
+            self._memory.clear()
+        for path in self.directory.glob("*.pkl"):
+            path.unlink(missing_ok=True)
+
+    def cached(self, func: Callable) -> Callable:
+        """Wrap `func` to look up its results in the cache."""
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                key = self.key(func, *args, **kwargs)
+            except TypeError:
+                # results of unidentifiable arguments are not cached
+                return func(*args, **kwargs)
+            res = self.get(key)
+            if res is None:
+                res = func(*args, **kwargs)
+                self.set(key, res)
+            else:
+                _replay(_arguments(func, *args, **kwargs), res)
+            return res
+
+        return wrapper
+
+
+_default_cache = None
+
+
+def get_cache() -> ResultCache:
+    """Default cache used by the cached functions of this module."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache()
+    return _default_cache
+
+
+def sensitivity_indices(*args, **kwargs):
+    """Cached `simdec.sensitivity_indices` using the default cache."""
+    return get_cache().cached(sensitivity_indices_)(*args, **kwargs)
+
+
+def decomposition(*args, **kwargs):
+    """Cached `simdec.decomposition` using the default cache."""
+    return get_cache().cached(decomposition_)(*args, **kwargs)
@@ -1,15 +1,26 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from dataclasses import dataclass
+import functools
 from hashlib import blake2b
 from typing import Literal
 
 import numpy as np
 import pandas as pd
-from scipy import stats
 
+from simdec.backends import get_backend
+from simdec.ingestion import (
+    _Columns,
+    _as_columns,
+    _as_domains,
+    _as_output,
+    _float_dtype,
+)
+from simdec.profiling import _phase, _profiled
 
-__all__ = ["decomposition", "states_expansion"]
+
+__all__ = ["decomposition", "states_expansion", "ScenarioIndexer"]
 
 
 def states_expansion(states: list[int], inputs: pd.DataFrame) -> list[list[str]]:
@@ -47,42 +58,467 @@ def states_expansion(states: list[int], inputs: pd.DataFrame) -> list[list[str]]
 class DecompositionResult:
     var_names: list[str]
     statistic: np.ndarray
-    bins: pd.DataFrame
     states: list[int]
     bin_edges: np.ndarray
+    scenarios: np.ndarray | None
+    output: np.ndarray | None
+    summary: pd.DataFrame | list[pd.DataFrame]
+    output_names: list | None = None
+    histogram: tuple[np.ndarray, np.ndarray] | None = None
+    profile: dict | None = None
+
+    @functools.cached_property
+    def bins(self) -> pd.DataFrame | list[pd.DataFrame]:
+        """Output of the runs of each scenario as columns padded with NaN.
+
+        Built from `scenarios` and `output` on first access, its size is
+        n_runs times n_scenarios. A list with several outputs.
+        """
+        if self.scenarios is None:
+            raise ValueError("The bins require the runs, not kept when streaming")
+        n_scenarios = int(np.prod(self.states))
+        if self.output.ndim == 1:
+            return _scenario_bins(self.scenarios, self.output, n_scenarios)
+        return [
+            _scenario_bins(self.scenarios, output, n_scenarios)
+            for output in self.output
+        ]
+
+    def select_output(self, output: int | str = 0) -> "DecompositionResult":
+        """Result of a single output, sharing the scenarios of the runs.
+
+        Parameters
+        ----------
+        output : int or str, default 0
+            Index of the output or its name in `output_names`.
+
+        """
+        if isinstance(output, str):
+            output = (self.output_names or []).index(output)
+        if not isinstance(self.summary, list):
+            if output != 0:
+                raise IndexError(f"Output {output} out of range for 1 output")
+            return self
+        return DecompositionResult(
+            var_names=self.var_names,
+            statistic=self.statistic[output],
+            states=self.states,
+            bin_edges=self.bin_edges,
+            scenarios=self.scenarios,
+            output=self.output[output],
+            summary=self.summary[output],
+            output_names=(
+                None if self.output_names is None else [self.output_names[output]]
+            ),
+            profile=self.profile,
+        )
 
     def __reduce__(self):
         h = blake2b(key=b"result hashing", digest_size=20)
 
         h.update(str(self.var_names).encode())
         h.update(str(self.statistic).encode())
-        h.update(str(self.bins).encode())
         h.update(str(self.states).encode())
         h.update(str(self.bin_edges).encode())
+        # the representation of the runs is truncated
+        runs = (self.scenarios, self.output) if self.histogram is None else ()
+        for array in (*runs, *(self.histogram or ())):
+            h.update(np.ascontiguousarray(array))
 
         return [h.hexdigest()]
 
 
+def _domain_edges(domain, n_states: int, x: np.ndarray) -> np.ndarray:
+    """Equal-probability edges of the states given the domain of `x`.
+
+    Bounds ``(low, high)`` are the support of a uniform distribution. Infinite
+    ends of the support of a distribution are replaced by the range of `x`.
+    """
+    if not hasattr(domain, "ppf"):
+        return np.linspace(*domain, n_states + 1)
+
+    edges = np.asarray(domain.ppf(np.linspace(0, 1, n_states + 1)), dtype=float)
+    if not np.isfinite(edges[0]):
+        edges[0] = np.min(x)
+    if not np.isfinite(edges[-1]):
+        edges[-1] = np.max(x)
+    return edges
+
+
+_STATISTICS = ("mean", "median")
+
+
+def _scenario_codes(inputs: _Columns, bin_edges: list[np.ndarray]) -> np.ndarray:
+    """Flat index of the scenario of each run.
+
+    Each column is digitized as in `scipy.stats.binned_statistic_dd` and the
+    states are combined in C order. Runs outside of the edges have the index
+    n_scenarios.
+    """
+    backend = get_backend()
+    shape = tuple(len(edges) - 1 for edges in bin_edges)
+
+    states = []
+    outside = np.zeros(inputs.n_runs, dtype=bool)
+    for i, edges in enumerate(bin_edges):
+        if np.diff(edges).min() == 0:
+            raise ValueError("The smallest edge difference is numerically 0.")
+        # double precision as the edges, their jitter is below single precision
+        x = np.asarray(inputs.data[i], dtype=np.float64)
+        states_i = backend.bin_codes(x, edges)
+        outside |= states_i >= shape[i]
+        states.append(states_i)
+
+    n_scenarios = int(np.prod(shape))
+    codes = np.ravel_multi_index(states, shape, mode="clip")
+    codes[outside] = n_scenarios
+    # small integers are sorted with a radix sort
+    return codes.astype(np.min_scalar_type(n_scenarios), copy=False)
+
+
+def _scenario_bins(
+    scenarios: np.ndarray, output: np.ndarray, n_scenarios: int
+) -> pd.DataFrame:
+    """Output of the runs of each scenario as columns padded with NaN."""
+    # runs grouped by scenario, in run order within a scenario
+    order = np.argsort(scenarios, kind="stable")
+    counts = np.bincount(scenarios, minlength=n_scenarios + 1)[:n_scenarios]
+    n_runs = counts.sum()
+    order = order[:n_runs]
+    # position of each run within its scenario
+    rows = np.arange(n_runs)
+    rows -= np.repeat(np.cumsum(counts) - counts, counts)
+
+    dtype = output.dtype if np.issubdtype(output.dtype, np.floating) else float
+    bins = np.full((counts.max(initial=0), n_scenarios), np.nan, dtype=dtype)
+    bins[rows, scenarios[order]] = output[order]
+    return pd.DataFrame(bins)
+
+
+def _scenario_summary(
+    scenarios: np.ndarray,
+    output: np.ndarray,
+    n_scenarios: int,
+    quantiles: Sequence[float] = (0.25, 0.5, 0.75),
+) -> list[pd.DataFrame]:
+    """Statistics of each output of each scenario as with ``bins.describe().T``.
+
+    The runs per scenario are counted once for all the columns of `output`.
+    Each output is sorted by scenario then value and every quantile is read
+    from the sorted values. NaN are ignored. The median is always included.
+    """
+    inside = scenarios < n_scenarios
+    if not inside.all():
+        scenarios, output = scenarios[inside], output[inside]
+
+    counts = np.bincount(scenarios, minlength=n_scenarios)
+    starts = np.cumsum(counts) - counts
+    quantiles = sorted({*quantiles, 0.5})
+
+    summaries = []
+    for output_ in output.T:
+        # sorted by scenario then value as `np.lexsort((output_, scenarios))`:
+        # a radix sort of the scenarios, stable on the values sorted first.
+        # NaN are sorted last within each scenario
+        order = np.argsort(output_)
+        values = output_[order[np.argsort(scenarios[order], kind="stable")]]
+        nan = np.isnan(output_)
+        n_valid = counts - np.bincount(scenarios, weights=nan, minlength=n_scenarios)
+        n_valid = n_valid.astype(int)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sums = np.bincount(
+                scenarios, weights=np.where(nan, 0, output_), minlength=n_scenarios
+            )
+            mean = sums / n_valid
+            deviations = output_ - mean[scenarios]
+            deviations[nan] = 0
+            deviations **= 2
+            squares = np.bincount(scenarios, weights=deviations, minlength=n_scenarios)
+            std = np.where(n_valid > 1, np.sqrt(squares / (n_valid - 1)), np.nan)
+
+        def quantile(q: float) -> np.ndarray:
+            if len(values) == 0:
+                # no run inside of the scenarios
+                return np.full(n_scenarios, np.nan)
+            # linear interpolation between the closest ranks
+            position = starts + q * np.maximum(n_valid - 1, 0)
+            low = np.minimum(np.floor(position).astype(int), len(values) - 1)
+            high = np.minimum(np.ceil(position).astype(int), len(values) - 1)
+            low_values = values[low].astype(np.float64)
+            high_values = values[high].astype(np.float64)
+            res = low_values + (high_values - low_values) * (position - low)
+            return np.where(n_valid > 0, res, np.nan)
+
+        summary = {"count": n_valid, "mean": mean, "std": std, "min": quantile(0)}
+        for q in quantiles:
+            summary[f"{100 * q:g}%"] = quantile(q)
+        summary["max"] = quantile(1)
+        summaries.append(pd.DataFrame(summary))
+    return summaries
+
+
+class ScenarioIndexer:
+    """Scenarios of the runs, fitted on a reference sample.
+
+    `fit` freezes the variables, their states and the edges of the states
+    as set by `decomposition`. `transform` then maps any batch of runs to
+    these scenarios with a binary search of the edges, without sorting the
+    inputs again. Decompositions of successive batches, or of chunks of a
+    large sample, are then comparable.
+
+    Parameters
+    ----------
+    dec_limit : float, optional
+        Explained variance ratio to filter the number input variables.
+    auto_ordering : bool, default True
+        Automatically order input columns based on the relative
+        sensitivity indices or use the provided order.
+    states : list of int, optional
+        List of possible states for the considered parameter. By default,
+        set on each `fit` as in `decomposition`.
+    domains : dict or list, optional
+        Known domain of the inputs, see `decomposition`.
+
+    Attributes
+    ----------
+    var_names : list
+        Names of the selected variables.
+    states : list of int
+        Number of states of each variable, None before `fit`.
+    bin_edges : list of ndarray
+        Edges of the states of each variable.
+    categories : dict
+        Categories of the categorical variables, by name, in the order of
+        their codes.
+
+    Examples
+    --------
+    >>> import simdec as sd
+    >>> indexer = sd.ScenarioIndexer().fit(inputs, si)  # doctest: +SKIP
+    >>> res = sd.decomposition(
+    ...     inputs=new_inputs, output=new_output, indexer=indexer
+    ... )  # doctest: +SKIP
+
+    """
+
+    def __init__(
+        self,
+        *,
+        dec_limit: float | None = None,
+        auto_ordering: bool = True,
+        states: list[int] | None = None,
+        domains: dict | list | None = None,
+    ):
+        self.dec_limit = dec_limit
+        self.auto_ordering = auto_ordering
+        # the fitted states are set by `fit`
+        self._states = states
+        self.states = None
+        self.domains = domains
+
+    @property
+    def n_scenarios(self) -> int:
+        return int(np.prod(self.states))
+
+    def fit(self, inputs, sensitivity_indices: np.ndarray) -> "ScenarioIndexer":
+        """Select the variables and set their states on a reference sample.
+
+        Parameters
+        ----------
+        inputs : DataFrame of shape (n_runs, n_factors)
+            Input variables, see `decomposition`.
+        sensitivity_indices : ndarray of shape (n_factors,)
+            Sensitivity indices, combined effect of each input.
+
+        """
+        # categories are coded in order of appearance as in `states_expansion`
+        inputs = _as_columns(inputs, sort=False, prefix=None)
+        dec_limit = self.dec_limit
+        auto_ordering = self.auto_ordering
+        states = None if self._states is None else list(self._states)
+        domains = _as_domains(self.domains, inputs.names)
+
+        # 1. variables for decomposition
+        sensitivity_indices = np.asarray(sensitivity_indices)
+        if sensitivity_indices.ndim == 2:
+            # with several outputs, the scenarios are formed for the first one
+            sensitivity_indices = sensitivity_indices[0]
+        var_order = np.argsort(sensitivity_indices)[::-1]
+
+        # only keep the explained variance corresponding to `dec_limit`
+        sensitivity_indices = sensitivity_indices[var_order]
+
+        if auto_ordering:
+            # handle edge case where sensitivity indices don't sum exactly to 1.0
+            if dec_limit is None:
+                dec_limit = 0.8 * np.sum(sensitivity_indices)
+
+            cumulative_sum = np.cumsum(sensitivity_indices)
+            indices_over_limit = np.where(cumulative_sum >= dec_limit)[0]
+
+            if indices_over_limit.size > 0:
+                n_var_dec = indices_over_limit[0] + 1
+            else:
+                n_var_dec = sensitivity_indices.size
+
+            n_var_dec = max(1, n_var_dec)  # keep at least one variable
+            n_var_dec = min(4, n_var_dec)  # use at most 4 variables
+        else:
+            n_var_dec = len(inputs)
+
+        # 2. variable selection and reordering
+        selection = var_order[:n_var_dec] if auto_ordering else range(n_var_dec)
+        inputs = inputs.select(selection)
+        domains = [domains[i] for i in selection]
+        var_names = inputs.names
+
+        # 3. states formation (after reordering/selection)
+        if states is None:
+            states = 3 if n_var_dec <= 2 else 2
+            states = [states] * n_var_dec
+
+            for i in range(n_var_dec):
+                if domains[i] is not None:
+                    # continuous input
+                    continue
+                n_unique = np.unique(inputs.data[i]).size
+                states[i] = n_unique if n_unique <= 5 else states[i]
+
+        # 4. bin edges of the states
+        with _phase("bin_edges"):
+            # make bins with equal number of samples for a given dimension
+            # sort and then split in n-state, or use the quantiles of the domain
+            bin_edges = []
+
+            for i, states_ in enumerate(states):
+                if domains[i] is not None:
+                    bin_edges.append(_domain_edges(domains[i], states_, inputs.data[i]))
+                    continue
+
+                sorted_col = np.sort(inputs.data[i])
+                uniq = np.unique(sorted_col)
+
+                # Categorical-like numeric inputs: if we have few unique numeric values,
+                # build edges around the unique values so we don't create empty states.
+                # We only apply this when the requested number of states matches the
+                # number of categories (uniq.size).
+                if uniq.size <= 5 and states_ == uniq.size:
+                    uniq = np.sort(uniq).astype(float)
+
+                    if uniq.size == 1:
+                        edges = np.array([uniq[0] - 0.5, uniq[0] + 0.5], dtype=float)
+                    else:
+                        gaps = np.diff(uniq)
+                        margin = 0.1 * np.min(gaps)
+                        edges = np.concatenate(
+                            (
+                                [uniq[0] - margin],
+                                uniq[:-1] + margin,
+                                [uniq[-1] + margin],
+                            )
+                        ).astype(float)
+
+                    bin_edges.append(edges)
+                    continue
+
+                # Default: equal-number-of-samples bins
+                splits = np.array_split(sorted_col, states_)
+                edges = [s[0] for s in splits]
+                edges.append(splits[-1][-1])  # last point to close the edges
+                edges = np.array(edges, dtype=float)
+                edges += 1e-10 * np.linspace(0, 1, len(edges))
+                bin_edges.append(edges)
+
+        self.var_names = var_names
+        self.states = list(states)
+        self.bin_edges = bin_edges
+        self.categories = dict(inputs.categories)
+        return self
+
+    def _columns(self, inputs) -> _Columns:
+        """Selected variables of `inputs`, coded as the reference sample."""
+        inputs = _as_columns(inputs, sort=False, prefix=None)
+        data = []
+        for name, edges in zip(self.var_names, self.bin_edges):
+            column = inputs[name]
+            reference = self.categories.get(name)
+            categories = inputs.categories.get(name)
+            if (reference is None) != (categories is None):
+                kind = "categorical" if reference is not None else "numeric"
+                raise ValueError(
+                    f"The variable {name!r} was {kind} in the reference sample."
+                )
+            if reference is None:
+                # the outer states extend to infinity, NaN stays outside
+                column = np.clip(column, edges[0], edges[-1])
+            elif not reference.equals(categories):
+                # unknown and missing categories are outside of the states
+                codes = reference.get_indexer(categories)
+                column = np.where(column >= 0, codes[column], -1)
+            data.append(column)
+        return _Columns(names=list(self.var_names), data=data, n_runs=inputs.n_runs)
+
+    def transform(self, inputs) -> np.ndarray:
+        """Scenario of each run of `inputs`.
+
+        Parameters
+        ----------
+        inputs : DataFrame of shape (n_runs, n_factors)
+            Input variables with the columns of the reference sample.
+
+        Returns
+        -------
+        scenarios : ndarray of shape (n_runs,)
+            Flat index of the scenario of each run, see
+            `DecompositionResult.scenarios`. Values beyond the outer edges
+            fall in the first or last state. Runs with a missing value or an
+            unknown category have the index `n_scenarios`.
+
+        """
+        return _scenario_codes(self._columns(inputs), self.bin_edges)
+
+    def fit_transform(self, inputs, sensitivity_indices: np.ndarray) -> np.ndarray:
+        """Fit on `inputs` and return their scenarios."""
+        return self.fit(inputs, sensitivity_indices).transform(inputs)
+
+
+@_profiled
 def decomposition(
     inputs: pd.DataFrame,
     output: pd.DataFrame,
     *,
-    sensitivity_indices: np.ndarray,
+    sensitivity_indices: np.ndarray | None = None,
+    indexer: ScenarioIndexer | None = None,
     dec_limit: float | None = None,
     auto_ordering: bool = True,
     states: list[int] | None = None,
     statistic: Literal["mean", "median"] | None = "mean",
+    quantiles: Sequence[float] = (0.25, 0.5, 0.75),
+    dtype: str | np.dtype | None = None,
+    domains: dict | list | None = None,
+    profile: bool = False,
 ) -> DecompositionResult:
     """SimDec decomposition.
 
     Parameters
     ----------
     inputs : DataFrame of shape (n_runs, n_factors)
-        Input variables.
-    output : DataFrame of shape (n_runs, 1) or (n_runs,)
-        Target variable.
-    sensitivity_indices : ndarray of shape (n_factors, 1)
-        Sensitivity indices, combined effect of each input.
+        Input variables. NumPy arrays, PyArrow and Polars tables are also
+        accepted, as well as paths to ``.npy`` and Arrow IPC files which are
+        memory mapped. Columns are not modified: categorical columns are coded
+        in order of appearance on the fly.
+    output : DataFrame of shape (n_runs, n_outputs) or (n_runs,)
+        Target variable, or a path as for `inputs`. Several outputs are
+        decomposed over the same scenarios, binning the inputs once.
+    sensitivity_indices : ndarray of shape (n_factors,) or (n_outputs, n_factors)
+        Sensitivity indices, combined effect of each input. With several
+        outputs, the variables are selected with the indices of the first
+        one. Not used with `indexer`.
+    indexer : ScenarioIndexer, optional
+        Fitted scenarios, e.g. of a reference sample. `dec_limit`,
+        `auto_ordering`, `states` and `domains` are then ignored and the
+        variables, states and edges of `indexer` are used.
     dec_limit : float
         Explained variance ratio to filter the number input variables.
     auto_ordering : bool
@@ -92,6 +528,24 @@ def decomposition(
         List of possible states for the considered parameter.
     statistic : {"mean", "median"}, optional
         Statistic to compute in each bin.
+    quantiles : sequence of float, default (0.25, 0.5, 0.75)
+        Quantiles of the output in each scenario, between 0 and 1, added to
+        the `summary`. The median is always included.
+    dtype : {"float32", "float64"}, optional
+        Precision of the inputs and output. ``"float32"`` halves the memory
+        of the output and of the bins. Edges are sorted in single precision
+        but scenarios are formed, and means accumulated, in double precision.
+        By default, floating point data keep their precision.
+    domains : dict or list, optional
+        Known domain of the inputs, by column name or in the order of the
+        columns: bounds ``(low, high)`` of a uniform distribution or a
+        distribution with ``cdf`` and ``ppf`` methods, e.g.
+        ``scipy.stats.norm()``. The edges of the states are its quantiles
+        instead of the quantiles of the sorted column.
+    profile : bool, default False
+        Record the wall time in seconds, the peak of allocated bytes and the
+        number of calls of each phase of the computation, see also
+        `set_profile_hook`.
 
     Returns
     -------
@@ -102,139 +556,95 @@ def decomposition(
             Variable names.
         statistic : ndarray of shape (n_factors, 1)
             Statistic in each bin.
-        bins : DataFrame
-            Multidimensional bins.
         states : list of int
             List of possible states for the considered parameter.
+        bin_edges : list of ndarray
+            Edges of the states of each variable.
+        scenarios : ndarray of shape (n_runs,)
+            Scenario of each run, as a flat index of `statistic`. Runs with
+            a missing value or an unknown category have the index
+            n_scenarios.
+        output : ndarray of shape (n_runs,)
+            Output of each run.
+        summary : DataFrame
+            Statistics of the output in each scenario, as rows in the order
+            of the flat `statistic`: "count", "mean", "std", "min", the
+            `quantiles` (e.g. "50%") and "max". NaN outputs are ignored, as
+            with ``bins.describe().T``.
+        bins : DataFrame
+            Multidimensional bins, the output of the runs of each scenario.
+            Built on first access, prefer `scenarios` and `output` with many
+            runs.
+        output_names : list, optional
+            Names of the columns of `output` if it is a table.
+        histogram : tuple of ndarray, optional
+            With `decomposition_streaming` only, the counts of the output of
+            each scenario, of shape (n_scenarios, n_bins), and the edges of
+            the output bins. `scenarios` and `output` are then None.
+        profile : dict, optional
+            With `profile`, statistics of each phase, e.g.
+            ``profile["scenarios"]["wall_time"]``. Phases are
+            "input_conversion", "bin_edges", "scenarios", "summary" and
+            "total", and "categorical_coding" with categorical inputs.
+
+        With several outputs, `statistic` and `output` are stacked along a
+        leading axis of size n_outputs, `summary` and `bins` are lists. The
+        result of each output is given by `DecompositionResult.select_output`.
 
     """
-    var_names = inputs.columns
-
-    cat_cols = inputs.select_dtypes(exclude=["number"])
-    for cat_col in cat_cols:
-        codes, cat_states_ = pd.factorize(inputs[cat_col])
-        inputs[cat_col] = codes
-
-    inputs = inputs.to_numpy()
-    output = output.to_numpy().flatten()
-
-    # 1. variables for decomposition
-    var_order = np.argsort(sensitivity_indices)[::-1]
-
-    # only keep the explained variance corresponding to `dec_limit`
-    sensitivity_indices = sensitivity_indices[var_order]
-
-    if auto_ordering:
-        # handle edge case where sensitivity indices don't sum exactly to 1.0
-        if dec_limit is None:
-            dec_limit = 0.8 * np.sum(sensitivity_indices)
-
-        cumulative_sum = np.cumsum(sensitivity_indices)
-        indices_over_limit = np.where(cumulative_sum >= dec_limit)[0]
-
-        if indices_over_limit.size > 0:
-            n_var_dec = indices_over_limit[0] + 1
-        else:
-            n_var_dec = sensitivity_indices.size
-
-        n_var_dec = max(1, n_var_dec)  # keep at least one variable
-        n_var_dec = min(4, n_var_dec)  # use at most 4 variables
+    with _phase("input_conversion"):
+        # categories are coded in order of appearance as in `states_expansion`
+        dtype = _float_dtype(dtype)
+        inputs = _as_columns(inputs, sort=False, prefix=None).astype(dtype)
+        # outputs are stacked as columns, (N,) and (N, 1) are a single output
+        output, output_names = _as_output(output)
+        if dtype is not None:
+            output = output.astype(dtype, copy=False)
+        multi_output = output.shape[1] > 1
+
+    if statistic not in _STATISTICS:
+        raise ValueError(f"'statistic' must be one of {_STATISTICS}")
+    if not all(0 <= q <= 1 for q in quantiles):
+        raise ValueError("'quantiles' must be between 0 and 1")
+
+    if indexer is None:
+        if sensitivity_indices is None:
+            raise ValueError("'sensitivity_indices' is required without 'indexer'")
+        indexer = ScenarioIndexer(
+            dec_limit=dec_limit,
+            auto_ordering=auto_ordering,
+            states=states,
+            domains=domains,
+        ).fit(inputs, sensitivity_indices)
+    states = indexer.states
+
+    with _phase("scenarios"):
+        scenarios = indexer.transform(inputs)
+        n_scenarios = indexer.n_scenarios
+        counts = np.bincount(scenarios, minlength=n_scenarios + 1)[:n_scenarios]
+
+    with _phase("summary"):
+        # all outputs share the scenarios of the runs
+        summary = _scenario_summary(scenarios, output, n_scenarios, quantiles)
+        res_statistic = []
+        for summary_ in summary:
+            statistic_ = summary_["mean" if statistic == "mean" else "50%"]
+            # NaN propagate to the statistic as with `np.mean` and `np.median`
+            statistic_ = statistic_.where(summary_["count"] == counts).to_numpy()
+            res_statistic.append(statistic_.reshape(states))
+
+    if multi_output:
+        output, res_statistic = output.T, np.stack(res_statistic)
     else:
-        n_var_dec = inputs.shape[1]
-
-    # 2. variable selection and reordering
-    if auto_ordering:
-        var_names = var_names[var_order[:n_var_dec]].tolist()
-        inputs = inputs[:, var_order[:n_var_dec]]
-    else:
-        var_names = var_names[:n_var_dec].tolist()
-        inputs = inputs[:, :n_var_dec]
-
-    # 3. states formation (after reordering/selection)
-    if states is None:
-        states = 3 if n_var_dec <= 2 else 2
-        states = [states] * n_var_dec
-
-        for i in range(n_var_dec):
-            n_unique = np.unique(inputs[:, i]).size
-            states[i] = n_unique if n_unique <= 5 else states[i]
-
-    # 4. decomposition
-    bins = []
-
-    statistic_methods = {
-        "mean": np.mean,
-        "median": np.median,
-    }
-    try:
-        statistic_method = statistic_methods[statistic]
-    except KeyError:
-        msg = f"'statistic' must be one of {statistic_methods.keys()}"
-        raise ValueError(msg)
-
-    def statistic_(inputs):
-        """Custom function to keep track of the content of bins."""
-        bins.append(inputs)
-        return statistic_method(inputs)
-
-    # make bins with equal number of samples for a given dimension
-    # sort and then split in n-state
-    sorted_inputs = np.sort(inputs, axis=0)
-    bin_edges = []
-
-    for i, states_ in enumerate(states):
-        col = inputs[:, i]
-        uniq = np.unique(col)
-
-        # Categorical-like numeric inputs: if we have few unique numeric values,
-        # build edges around the unique values so we don't create empty states.
-        # We only apply this when the requested number of states matches the
-        # number of categories (uniq.size).
-        if uniq.size <= 5 and states_ == uniq.size:
-            uniq = np.sort(uniq).astype(float)
-
-            if uniq.size == 1:
-                edges = np.array([uniq[0] - 0.5, uniq[0] + 0.5], dtype=float)
-            else:
-                gaps = np.diff(uniq)
-                margin = 0.1 * np.min(gaps)
-                edges = np.concatenate(
-                    ([uniq[0] - margin], uniq[:-1] + margin, [uniq[-1] + margin])
-                ).astype(float)
-
-            bin_edges.append(edges)
-            continue
-
-        # Default: equal-number-of-samples bins
-        splits = np.array_split(sorted_inputs[:, i], states_)
-        edges = [s[0] for s in splits]
-        edges.append(splits[-1][-1])  # last point to close the edges
-        edges = np.array(edges, dtype=float)
-        edges += 1e-10 * np.linspace(0, 1, len(edges))
-        bin_edges.append(edges)
-
-    res = stats.binned_statistic_dd(
-        inputs, values=output, statistic=statistic_, bins=bin_edges
-    )
-
-    bins = pd.DataFrame(bins[1:]).T
-
-    if len(bins.columns) != np.prod(states):
-        # mismatch with the number of states vs bins
-        # when it happens, we have NaNs in the statistic
-        # we can add empty columns with NaNs on these positions as bins
-        # then are not present for these states
-        nan_idx = np.argwhere(np.isnan(res.statistic).flatten()).flatten()
-
-        for idx in nan_idx:
-            bins = np.insert(bins, idx, np.nan, axis=1)
-
-        bins = pd.DataFrame(bins)
+        output, res_statistic, summary = output[:, 0], res_statistic[0], summary[0]
 
     return DecompositionResult(
-        var_names=var_names,
-        statistic=res.statistic,
-        bins=bins,
+        var_names=indexer.var_names,
+        statistic=res_statistic,
         states=states,
-        bin_edges=res.bin_edges,
+        bin_edges=indexer.bin_edges,
+        scenarios=scenarios,
+        output=output,
+        summary=summary,
+        output_names=output_names,
     )
@@ -6,6 +6,7 @@ import numpy as np
 import pandas as pd
 
 import simdec as sd
+from simdec.ingestion import _as_columns, _as_output
 
 logger = logging.getLogger(__name__)
 
@@ -34,9 +35,11 @@ def heterogeneity_indices(
     Parameters
     ----------
     output : pd.Series
-        Model output vector.
+        Model output vector, or a path as for `inputs`.
     inputs : pd.DataFrame
-        Input/feature matrix.
+        Input/feature matrix. NumPy arrays, PyArrow and Polars tables are
+        also accepted, as well as paths to ``.npy`` and Arrow IPC files which
+        are memory mapped. Regions are read one column at a time.
     split_variable : str or pd.Series
         Variable to split on. If string, must be a column in 'inputs'.
     n_subdivisions : int, optional
@@ -62,13 +65,21 @@ def heterogeneity_indices(
             The name of the variable used to split the data.
 
     """
-    y = pd.Series(output).reset_index(drop=True)
-    X = pd.DataFrame(inputs).reset_index(drop=True)
+    # converted once, regions are subsets of the same columns
+    y = _as_output(output)[0][:, 0]
+    X = _as_columns(inputs, prefix=None)
 
     if isinstance(split_variable, str):
-        if split_variable not in X.columns:
+        if split_variable not in X.names:
             raise ValueError(f"'{split_variable}' not found in inputs.")
-        z = X[split_variable].reset_index(drop=True)
+        if split_variable in X.categories:
+            z = pd.Series(
+                pd.Categorical.from_codes(
+                    X[split_variable], X.categories[split_variable]
+                )
+            )
+        else:
+            z = pd.Series(X[split_variable], copy=False)
         split_name = split_variable
     else:
         z = pd.Series(split_variable).reset_index(drop=True)
@@ -101,7 +112,7 @@ def heterogeneity_indices(
     skipped = []
 
     for region in regions.cat.categories:
-        mask = regions == region
+        mask = (regions == region).to_numpy()
         n_in_region = mask.sum()
 
         if n_in_region < 10:
@@ -109,11 +120,11 @@ def heterogeneity_indices(
             skipped.append((region, n_in_region, "too few samples (< 10)"))
             continue
 
-        X_sub = X.loc[mask]
-        y_sub = y.loc[mask]
+        X_sub = X.take(mask)
+        y_sub = y[mask]
 
         # Skip if output has zero or near-zero variance in this region
-        if y_sub.var() < 1e-12:
+        if np.var(y_sub, ddof=1) < 1e-12:
             skipped.append((region, n_in_region, "output variance ≈ 0"))
             continue
 
@@ -126,7 +137,7 @@ def heterogeneity_indices(
                 skipped.append((region, n_in_region, "non-finite SI values"))
                 continue
 
-            si_region = pd.Series(si_vals, index=X.columns, name=region)
+            si_region = pd.Series(si_vals, index=X.names, name=region)
             regional_profiles.append(si_region)
 
         except Exception as e:
@@ -156,7 +167,7 @@ def heterogeneity_indices(
     res_global = sd.sensitivity_indices(inputs=X, output=y)
     overall_si = pd.Series(
         np.asarray(res_global.si).ravel(),
-        index=X.columns,
+        index=X.names,
         name="Overall_SI",
     )
 
@@ -0,0 +1,341 @@
+"""Conversion of the data containers to numeric columns.
+
+Inputs become a list of 1-D columns: numeric columns are views of the
+original data, other columns are replaced by integer codes with their
+category map. pandas, NumPy, PyArrow and Polars containers are supported
+without importing the optional libraries.
+
+Paths to ``.npy`` and Arrow IPC files are memory mapped. Columns which
+cannot be viewed, e.g. chunked Arrow columns or subsets of the runs, are
+converted on access so that a single column is in memory at a time.
+"""
+
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+import os
+import pathlib
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from simdec.profiling import _phase
+
+
+__all__ = []
+
+
+class _LazyData(Sequence):
+    """Sequence of columns converted with `convert` on access."""
+
+    def __init__(self, items: Sequence, convert: Callable[[Any], np.ndarray]):
+        self.items = items
+        self.convert = convert
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        return self.convert(self.items[i])
+
+
+@dataclass
+class _Columns:
+    """Numeric columns of the inputs.
+
+    Attributes
+    ----------
+    names : list
+        Name of each column.
+    data : sequence of ndarray of shape (n_runs,)
+        Values of the numeric columns, codes of the categorical columns.
+        Columns may be converted on access: index `data` once per use.
+    categories : dict
+        Category of each code of the categorical columns, by name.
+    n_runs : int, optional
+        Number of runs, from the first column by default.
+
+    """
+
+    names: list
+    data: Sequence[np.ndarray]
+    categories: dict = field(default_factory=dict)
+    n_runs: int | None = None
+
+    def __post_init__(self):
+        if self.n_runs is None:
+            self.n_runs = len(self.data[0]) if len(self.data) else 0
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, name) -> np.ndarray:
+        return self.data[self.names.index(name)]
+
+    def select(self, indices: Sequence[int]) -> "_Columns":
+        """Subset of the columns, without copy."""
+        names = [self.names[i] for i in indices]
+        return _Columns(
+            names=names,
+            data=_LazyData(list(indices), self.data.__getitem__),
+            categories={k: v for k, v in self.categories.items() if k in names},
+            n_runs=self.n_runs,
+        )
+
+    def take(self, runs: np.ndarray | slice) -> "_Columns":
+        """Subset of the runs of all columns, copied on access."""
+        if isinstance(runs, slice):
+            n_runs = len(range(self.n_runs)[runs])
+        elif np.asarray(runs).dtype == bool:
+            n_runs = np.count_nonzero(runs)
+        else:
+            n_runs = len(runs)
+        return _Columns(
+            names=self.names,
+            data=_LazyData(self.data, lambda column: column[runs]),
+            categories=self.categories,
+            n_runs=n_runs,
+        )
+
+    def astype(self, dtype: np.dtype | None) -> "_Columns":
+        """Columns converted to `dtype` on access, unchanged if None."""
+        if dtype is None:
+            return self
+        return _Columns(
+            names=self.names,
+            data=_LazyData(self.data, lambda column: column.astype(dtype, copy=False)),
+            categories=self.categories,
+            n_runs=self.n_runs,
+        )
+
+    def to_numpy(self, dtype: np.dtype | None = None) -> np.ndarray:
+        """Columns stacked in an array of shape (n_runs, n_factors)."""
+        array = np.empty((self.n_runs, len(self)), dtype=dtype, order="F")
+        for i, column in enumerate(self.data):
+            array[:, i] = column
+        return array
+
+
+def _float_dtype(dtype) -> np.dtype | None:
+    """Validated working precision, see the `dtype` of the analyses."""
+    if dtype is None:
+        return None
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError("'dtype' can only be 'float32' or 'float64'")
+    return dtype
+
+
+def _as_domains(domains, names: list) -> list:
+    """Domain of each column: None, bounds ``(low, high)`` or a distribution.
+
+    `domains` is a mapping of column names or a sequence in the order of the
+    columns. Distributions are objects with ``cdf`` and ``ppf`` methods, e.g.
+    frozen distributions of `scipy.stats`.
+    """
+    if domains is None:
+        return [None] * len(names)
+    if isinstance(domains, dict):
+        unknown = set(domains) - set(names)
+        if unknown:
+            raise ValueError(f"'domains' has unknown columns: {sorted(unknown)}")
+        domains = [domains.get(name) for name in names]
+    elif len(domains) != len(names):
+        raise ValueError("'domains' must have one entry per input column")
+
+    for name, domain in zip(names, domains):
+        if domain is None or (hasattr(domain, "cdf") and hasattr(domain, "ppf")):
+            continue
+        if not (np.ndim(domain) == 1 and len(domain) == 2 and domain[0] < domain[1]):
+            raise ValueError(
+                f"The domain of {name!r} must be bounds (low, high) with low < "
+                "high or a distribution with 'cdf' and 'ppf' methods"
+            )
+    return list(domains)
+
+
+def _library(obj) -> str:
+    return type(obj).__module__.partition(".")[0]
+
+
+def _code(series: pd.Series, sort: bool) -> tuple[np.ndarray, pd.Index]:
+    """Integer codes and categories of a non numeric column.
+
+    With `sort`, the codes follow the order of the categories, as with
+    ``astype("category").cat.codes``. Otherwise the order of appearance, as
+    with ``pd.factorize``.
+    """
+    if sort and isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), series.cat.categories
+    if sort and pd.api.types.is_bool_dtype(series.dtype):
+        return series.to_numpy().view(np.uint8), pd.Index([False, True])
+    return pd.factorize(series, sort=sort)
+
+
+def _is_numeric(series: pd.Series) -> bool:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return False
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return False
+    return pd.api.types.is_numeric_dtype(series.dtype)
+
+
+def _numeric(series: pd.Series) -> np.ndarray:
+    """Values of a numeric column, a view for NumPy backed data."""
+    if isinstance(series.dtype, np.dtype):
+        return series.to_numpy()
+    # nullable and Arrow backed dtypes
+    return series.to_numpy(dtype=float, na_value=np.nan)
+
+
+def _is_arrow_numeric(column) -> bool:
+    import pyarrow as pa
+
+    return pa.types.is_integer(column.type) or pa.types.is_floating(column.type)
+
+
+def _arrow_numeric(column) -> np.ndarray:
+    """Values of a numeric Arrow (chunked) array, a view for a single chunk
+    without nulls. Nulls become NaN."""
+    return column.to_numpy(zero_copy_only=False)
+
+
+def _as_numpy(column) -> np.ndarray:
+    return column if isinstance(column, np.ndarray) else _arrow_numeric(column)
+
+
+def _load(path: str | os.PathLike):
+    """Memory mapped array of a ``.npy`` file or table of an Arrow IPC file."""
+    path = pathlib.Path(path)
+    if path.suffix == ".npy":
+        return np.load(path, mmap_mode="r")
+    if path.suffix in {".arrow", ".feather", ".ipc"}:
+        import pyarrow as pa
+
+        with pa.memory_map(str(path)) as source:
+            return pa.ipc.open_file(source).read_all()
+    raise ValueError(
+        f"Cannot read '{path}': only '.npy' and Arrow IPC files "
+        "('.arrow', '.feather', '.ipc') are supported"
+    )
+
+
+def _as_columns(inputs, *, sort: bool = True, prefix: str | None = "x") -> _Columns:
+    """Numeric columns of `inputs`.
+
+    Parameters
+    ----------
+    inputs : DataFrame, ndarray, pyarrow.Table, polars.DataFrame or path
+        Input variables, of shape (n_runs, n_factors). Paths to ``.npy`` and
+        Arrow IPC files are memory mapped.
+    sort : bool, default True
+        Order of the codes of the categorical columns, see `_code`.
+    prefix : str, optional
+        Names of the columns of arrays are `prefix` followed by their
+        index, or their index if None.
+
+    """
+    if isinstance(inputs, _Columns):
+        return inputs
+    if isinstance(inputs, (str, os.PathLike)):
+        inputs = _load(inputs)
+
+    library = _library(inputs)
+    if library == "pyarrow":
+        names = list(inputs.column_names)
+        columns = [
+            column if _is_arrow_numeric(column) else column.to_pandas()
+            for column in inputs.columns
+        ]
+    elif library == "polars":
+        names = list(inputs.columns)
+        columns = [inputs.get_column(name) for name in names]
+        columns = [
+            (
+                column.to_numpy()
+                if column.dtype.is_numeric() and column.null_count() == 0
+                else pd.Series(column.to_list(), name=column.name)
+            )
+            for column in columns
+        ]
+    elif isinstance(inputs, pd.DataFrame):
+        names = inputs.columns.tolist()
+        columns = [inputs.iloc[:, i] for i in range(inputs.shape[1])]
+    else:
+        inputs = np.asarray(inputs)
+        if inputs.ndim == 1:
+            inputs = inputs[:, np.newaxis]
+        names = [
+            i if prefix is None else f"{prefix}{i}" for i in range(inputs.shape[1])
+        ]
+        columns = [inputs[:, i] for i in range(inputs.shape[1])]
+
+    data = []
+    categories = {}
+    for name, column in zip(names, columns):
+        if library == "pyarrow" and not isinstance(column, pd.Series):
+            data.append(column)
+            continue
+        if isinstance(column, np.ndarray) and column.dtype.kind in "iufb":
+            if column.dtype.kind == "b":
+                column = pd.Series(column, copy=False)
+            else:
+                data.append(column)
+                continue
+        elif isinstance(column, np.ndarray):
+            column = pd.Series(column, copy=False)
+
+        if _is_numeric(column):
+            data.append(_numeric(column))
+        else:
+            with _phase("categorical_coding"):
+                codes, categories[name] = _code(column, sort=sort)
+            data.append(codes)
+
+    if library == "pyarrow":
+        # numeric Arrow columns are converted one at a time
+        return _Columns(
+            names=names,
+            data=_LazyData(data, _as_numpy),
+            categories=categories,
+            n_runs=inputs.num_rows,
+        )
+    return _Columns(names=names, data=data, categories=categories)
+
+
+def _as_output(output) -> tuple[np.ndarray, list | None]:
+    """Output as an array of shape (n_runs, n_outputs) and the output names.
+
+    Names are only returned for tables with named columns and named series.
+    Paths are read as in `_as_columns`.
+    """
+    if isinstance(output, (str, os.PathLike)):
+        output = _load(output)
+
+    library = _library(output)
+    names = None
+    if library == "pyarrow" and hasattr(output, "column_names"):
+        names = list(output.column_names)
+        if output.num_columns == 1:
+            output = _arrow_numeric(output.column(0))
+        else:
+            output = np.column_stack(
+                [_arrow_numeric(column) for column in output.columns]
+            )
+    elif library == "pyarrow":
+        output = _arrow_numeric(output)
+    elif library == "polars" and hasattr(output, "columns"):
+        names = list(output.columns)
+        output = output.to_numpy()
+    elif library == "polars":
+        output = output.to_numpy()
+    elif isinstance(output, pd.DataFrame):
+        names = output.columns.tolist()
+        output = output.to_numpy()
+    elif isinstance(output, pd.Series):
+        if output.name is not None:
+            names = [output.name]
+        output = _numeric(output)
+
+    output = np.asarray(output)
+    return output.reshape(len(output), -1), names
@@ -0,0 +1,108 @@
+from collections.abc import Callable
+import contextlib
+import contextvars
+import functools
+import time
+import tracemalloc
+
+
+__all__ = ["set_profile_hook"]
+
+
+# Profile of the call being profiled, None when profiling is disabled
+_current_profile = contextvars.ContextVar("simdec_profile", default=None)
+_profile_hook = None
+
+
+def set_profile_hook(hook: Callable[[str, dict], None] | None) -> None:
+    """Register a callback receiving the profile of every profiled call.
+
+    While a hook is registered, all calls are profiled as if called with
+    ``profile=True``.
+
+    Parameters
+    ----------
+    hook : callable or None
+        ``hook(name, profile)`` with the name of the function and its profile,
+        see the `profile` attribute of the results. None removes the hook.
+
+    """
+    global _profile_hook
+    _profile_hook = hook
+
+
+class _Profile:
+    """Phases of a profiled call and the peak memory of the open phases."""
+
+    def __init__(self):
+        self.phases = {}
+        self.open_peaks = []
+
+    def update_peaks(self) -> int:
+        current, peak = tracemalloc.get_traced_memory()
+        self.open_peaks = [max(open_peak, peak) for open_peak in self.open_peaks]
+        return current
+
+
+@contextlib.contextmanager
+def _phase(name: str):
+    """Record wall time, peak allocated bytes and number of calls of a phase.
+
+    Does nothing outside of a profiled call.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+
+    # the peak of tracemalloc is shared: save it for the enclosing phases
+    memory_start = profile.update_peaks()
+    tracemalloc.reset_peak()
+    profile.open_peaks.append(memory_start)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        wall_time = time.perf_counter() - start
+        profile.update_peaks()
+        memory = profile.open_peaks.pop() - memory_start
+
+        stats = profile.phases.setdefault(
+            name, {"wall_time": 0.0, "memory": 0, "calls": 0}
+        )
+        stats["wall_time"] += wall_time
+        stats["memory"] = max(stats["memory"], memory)
+        stats["calls"] += 1
+
+
+def _profiled(func: Callable) -> Callable:
+    """Profile `func` when called with ``profile=True`` or a hook is set.
+
+    The phases recorded with `_phase` are stored in the `profile` attribute
+    of the returned result, along with the total of the call.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not kwargs.get("profile", False) and _profile_hook is None:
+            return func(*args, **kwargs)
+
+        profile = _Profile()
+        token = _current_profile.set(profile)
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        try:
+            with _phase("total"):
+                res = func(*args, **kwargs)
+        finally:
+            _current_profile.reset(token)
+            if not tracing:
+                tracemalloc.stop()
+
+        res.profile = profile.phases
+        if _profile_hook is not None:
+            _profile_hook(func.__name__, profile.phases)
+        return res
+
+    return wrapper
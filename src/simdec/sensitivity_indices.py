@@ -1,11 +1,32 @@
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
+from hashlib import blake2b
+from multiprocessing import shared_memory
+import os
+import sys
+import threading
+import time
+from typing import Literal
+import warnings
 
 import numpy as np
 import pandas as pd
-from scipy import stats
+from scipy.stats import qmc
 
+from simdec.backends import _bin_sums, get_backend, set_backend
+from simdec.ingestion import (
+    _Columns,
+    _as_columns,
+    _as_domains,
+    _as_output,
+    _float_dtype,
+)
+from simdec.profiling import _phase, _profiled
 
-__all__ = ["sensitivity_indices"]
+
+__all__ = ["sensitivity_indices", "set_soe_cache"]
 
 
 def number_of_bins(n_runs: int, n_factors: int) -> tuple[int, int]:
@@ -24,22 +45,604 @@ def number_of_bins(n_runs: int, n_factors: int) -> tuple[int, int]:
 
 
 def _weighted_var(x: np.ndarray, weights: np.ndarray) -> np.ndarray:
-    avg = np.average(x, weights=weights)
-    variance = np.average((x - avg) ** 2, weights=weights)
+    avg = np.average(x, weights=weights, axis=0)
+    variance = np.average((x - avg) ** 2, weights=weights, axis=0)
     return variance
 
 
+def _range_edges(
+    x_min: float, x_max: float, n_bins: int, dtype: np.dtype = float
+) -> np.ndarray:
+    """Equal-width bin edges between `x_min` and `x_max`."""
+    x_min, x_max = float(x_min), float(x_max)
+    if x_min == x_max:
+        x_min, x_max = x_min - 0.5, x_max + 0.5
+    return np.linspace(x_min, x_max, n_bins + 1, dtype=dtype)
+
+
+def _bin_edges(
+    x: np.ndarray, n_bins: int, x_range: tuple[float, float] | None = None
+) -> np.ndarray:
+    """Equal-width bin edges spanning `x_range`, the range of `x` by default.
+
+    Follows `scipy.stats.binned_statistic` so that codes are identical.
+    """
+    dtype = x.dtype if np.issubdtype(x.dtype, np.floating) else float
+    if x_range is None:
+        x_range = np.min(x), np.max(x)
+    return _range_edges(*x_range, n_bins, dtype=dtype)
+
+
+def _domain_values(x: np.ndarray, domain) -> tuple[np.ndarray, tuple]:
+    """Values to bin and the range of their bins given the domain of `x`.
+
+    Without `domain` the range of `x` is scanned. With bounds ``(low, high)``
+    they are the range, values beyond them are detected once binned. With a
+    distribution, `x` is mapped through its CDF: equal-width bins of [0, 1]
+    are equal-probability bins of `x`.
+    """
+    if domain is None:
+        return x, (np.min(x), np.max(x))
+    if hasattr(domain, "cdf"):
+        u = np.asarray(domain.cdf(x))
+        if np.issubdtype(x.dtype, np.floating):
+            u = u.astype(x.dtype, copy=False)
+        return u, (0.0, 1.0)
+    low, high = domain
+    return x, (low, high)
+
+
+def _bin_codes(x: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Zero-based bin index of each sample of `x` with the active backend.
+
+    Values on the rightmost edge belong to the last bin, as in
+    `scipy.stats.binned_statistic`. Codes use the smallest unsigned dtype.
+    """
+    return get_backend().bin_codes(x, edges)
+
+
+def _conditional_var(codes: np.ndarray, output: np.ndarray, n_bins: int) -> np.ndarray:
+    """Var(E[Y|bin]): variance of the bin means weighted by the bin counts.
+
+    `output` is of shape (n_runs, n_outputs) and the result (n_outputs,).
+    """
+    counts, sums = get_backend().bin_statistics(codes, output, n_bins)
+    return _binned_var(counts, sums)
+
+
+def _binned_var(counts: np.ndarray, sums: np.ndarray) -> np.ndarray:
+    """Var(E[Y|bin]) from counts (n_bins,) and sums (n_bins, n_outputs)."""
+    mask = counts > 0
+    means = sums[mask] / counts[mask, np.newaxis]
+    return _weighted_var(means, weights=counts[mask])
+
+
+def _batch_binned_var(counts: np.ndarray, sums: np.ndarray) -> np.ndarray:
+    """`_binned_var` of a batch of binned statistics, e.g. replicates or pairs.
+
+    `counts` is of shape (n_batch, n_bins), `sums` (n_batch, n_bins, n_outputs)
+    and the result (n_batch, n_outputs).
+    """
+    n = counts.sum(axis=1)[:, np.newaxis]
+    avg = sums.sum(axis=1) / n
+
+    counts = counts[..., np.newaxis]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        deviation = np.where(counts > 0, sums / counts - avg[:, np.newaxis], 0)
+    return (counts * deviation**2).sum(axis=1) / n
+
+
+def _combine_effects(
+    var_y: np.ndarray,
+    var_foe: np.ndarray,
+    var_soe: np.ndarray,
+    var_ij: np.ndarray,
+    pairs: list[tuple[int, int]],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sensitivity indices from the conditional variances.
+
+    Variances have a trailing n_outputs axis. Indices are returned stacked
+    along a leading n_outputs axis.
+    """
+    n_factors, n_outputs = var_foe.shape
+
+    foe = var_foe / var_y
+
+    soe = np.zeros((n_factors, n_factors, n_outputs))
+    if pairs:
+        i, j = np.asarray(pairs).T
+        soe[i, j] = (var_ij - var_soe[i] - var_soe[j]) / var_y
+
+    # Mirror SOE and calculate Combined Effect (SI)
+    # SI is FOE + half of all interactions associated with that variable
+    soe = soe + soe.transpose(1, 0, 2)
+    si = foe + soe.sum(axis=0) / 2
+
+    return si.T, foe.T, soe.transpose(2, 0, 1)
+
+
+def _screen_pairs(
+    foe: np.ndarray, threshold: float | None, top_k: int | None
+) -> tuple[list[tuple[int, int]], list[tuple[int, int]]]:
+    """Pairs of influential factors, and skipped pairs.
+
+    Factors are ranked by their largest first-order effect over the
+    outputs, the maximum of each row of `foe` of shape (n_factors,
+    n_outputs). They are influential if this effect is at least `threshold`
+    and among the `top_k` largest of the factors above `threshold`.
+    """
+    n_factors = foe.shape[0]
+    foe = foe.max(axis=1)
+
+    candidates = np.ones(n_factors, dtype=bool)
+    if threshold is not None:
+        candidates &= foe >= threshold
+    if top_k is not None:
+        ranked = np.argsort(np.where(candidates, foe, -np.inf))[::-1]
+        candidates[ranked[top_k:]] = False
+
+    pairs, skipped = [], []
+    for i in range(n_factors):
+        for j in range(i + 1, n_factors):
+            if candidates[i] and candidates[j]:
+                pairs.append((i, j))
+            else:
+                skipped.append((i, j))
+    return pairs, skipped
+
+
+def _pair_conditional_vars(
+    codes: np.ndarray, output: np.ndarray, n_bins: int, pairs: list[tuple[int, int]]
+) -> np.ndarray:
+    """Var(E[Y|Xi, Xj]) of each pair on the joint n_bins x n_bins grid.
+
+    `codes` is of shape (n_factors, n_runs) and the result (n_pairs, n_outputs).
+    """
+    backend = get_backend()
+    var_ij = np.empty((len(pairs), output.shape[1]))
+    for k, (i, j) in enumerate(pairs):
+        counts, sums = backend.pair_statistics(codes[i], codes[j], n_bins, output)
+        var_ij[k] = _binned_var(counts, sums)
+    return var_ij
+
+
+def _onehot_pair_conditional_vars(
+    codes: np.ndarray, output: np.ndarray, n_bins: int, pairs: list[tuple[int, int]]
+) -> np.ndarray:
+    """`_pair_conditional_vars` for all pairs at once with one-hot products.
+
+    With the one-hot encoding O of the codes of all factors, of shape
+    (n_runs, n_factors * n_bins), the joint counts of every pair are the blocks
+    of O.T @ O and the joint sums the blocks of O.T @ diag(y) @ O. O is built
+    by blocks of runs and the products are dense matrix products.
+    """
+    # only encode the factors involved in the pairs
+    if len(pairs) == 0:
+        return np.empty((0, output.shape[1]))
+    pairs = np.asarray(pairs, dtype=np.intp).reshape(-1, 2)
+    factors, pairs = np.unique(pairs, return_inverse=True)
+    pairs = pairs.reshape(-1, 2)
+    codes = codes[factors]
+
+    n_factors, n_runs = codes.shape
+    n_outputs = output.shape[1]
+    n_cols = n_factors * n_bins
+    offsets = np.arange(n_factors) * n_bins
+
+    counts = np.zeros((n_cols, n_cols))
+    sums = np.zeros((n_outputs * n_cols, n_cols))
+
+    # bound the size of the one-hot and weighted one-hot blocks
+    block_size = max(1, 2**24 // (n_cols * (n_outputs + 1)))
+    for start in range(0, n_runs, block_size):
+        block = slice(start, start + block_size)
+        indices = codes[:, block].T.astype(np.intp) + offsets
+        onehot = np.zeros((len(indices), n_cols))
+        np.put_along_axis(onehot, indices, 1.0, axis=1)
+
+        weighted = onehot[:, np.newaxis, :] * output[block, :, np.newaxis]
+        counts += onehot.T @ onehot
+        sums += weighted.reshape(len(indices), -1).T @ onehot
+
+    i, j = pairs.T
+    counts = counts.reshape(n_factors, n_bins, n_factors, n_bins)
+    counts = counts.transpose(0, 2, 1, 3)[i, j].reshape(len(pairs), n_bins**2)
+    sums = sums.reshape(n_outputs, n_factors, n_bins, n_factors, n_bins)
+    sums = sums.transpose(1, 3, 2, 4, 0)[i, j].reshape(len(pairs), n_bins**2, -1)
+
+    return _batch_binned_var(counts, sums)
+
+
+# Runs are split in random groups whose binned statistics are re-weighted
+_N_BOOTSTRAP_GROUPS = 100
+
+
+def _bootstrap_conditional_var(
+    codes: np.ndarray,
+    output: np.ndarray,
+    n_bins: int,
+    groups: np.ndarray,
+    weights: np.ndarray,
+) -> np.ndarray:
+    """Var(E[Y|bin]) of bootstrap replicates, shape (n_bootstrap, n_outputs).
+
+    Counts and sums are binned once per group of runs. A replicate weights
+    each group by its multiplicity in `weights` (n_bootstrap, n_groups).
+    """
+    n_groups = weights.shape[1]
+    codes_g = groups * n_bins + codes
+
+    counts, sums = get_backend().bin_statistics(codes_g, output, n_groups * n_bins)
+    counts = counts.reshape(n_groups, n_bins)
+    sums = sums.reshape(n_groups, n_bins, -1)
+
+    counts = weights @ counts
+    sums = np.tensordot(weights, sums, axes=1)
+    return _batch_binned_var(counts, sums)
+
+
+def _bootstrap_intervals(
+    codes_foe: np.ndarray,
+    codes_soe: np.ndarray,
+    output: np.ndarray,
+    *,
+    n_bins_foe: int,
+    n_bins_soe: int,
+    pairs: list[tuple[int, int]],
+    n_bootstrap: int,
+    confidence_level: float,
+    rng: np.random.Generator | int | None,
+) -> list[np.ndarray]:
+    """Percentile bootstrap confidence intervals of si, foe and soe.
+
+    Intervals are stacked along a leading axis of size 2 (low, high) followed
+    by the n_outputs axis.
+    """
+    rng = np.random.default_rng(rng)
+    n_runs, n_outputs = output.shape
+    n_groups = min(n_runs, _N_BOOTSTRAP_GROUPS)
+    groups = rng.integers(n_groups, size=n_runs)
+    weights = rng.multinomial(
+        n_groups, np.full(n_groups, 1 / n_groups), size=n_bootstrap
+    )
+
+    # Replicates are handled as extra outputs: (n_bootstrap * n_outputs)
+    output_c = output - output.mean(axis=0)
+    n_b = (weights @ np.bincount(groups, minlength=n_groups))[:, np.newaxis]
+    sum_b = weights @ _bin_sums(groups, output_c, n_groups)
+    sum2_b = weights @ _bin_sums(groups, output_c**2, n_groups)
+    var_y_b = sum2_b / n_b - (sum_b / n_b) ** 2
+
+    def replicates(codes, n_bins):
+        var_b = _bootstrap_conditional_var(codes, output, n_bins, groups, weights)
+        return var_b.reshape(-1)
+
+    var_foe_b = np.array([replicates(codes, n_bins_foe) for codes in codes_foe])
+    var_soe_b = np.array([replicates(codes, n_bins_soe) for codes in codes_soe])
+    if pairs:
+        var_ij_b = np.array(
+            [
+                replicates(
+                    codes_soe[i].astype(np.intp) * n_bins_soe + codes_soe[j],
+                    n_bins_soe**2,
+                )
+                for i, j in pairs
+            ]
+        )
+    else:
+        # no second-order effect, their intervals have zero width
+        var_ij_b = np.empty((0, var_y_b.size))
+
+    indices_b = _combine_effects(
+        var_y_b.reshape(-1), var_foe_b, var_soe_b, var_ij_b, pairs
+    )
+
+    alpha = 1 - confidence_level
+    cis = []
+    for indices_b_ in indices_b:
+        indices_b_ = indices_b_.reshape(n_bootstrap, n_outputs, *indices_b_.shape[1:])
+        cis.append(np.quantile(indices_b_, [alpha / 2, 1 - alpha / 2], axis=0))
+    return cis
+
+
+# Arrays attached from shared memory in each worker process
+_soe_worker_state = {}
+
+
+# Bytes of an entry of the OrderedDict of `_PairCache`, besides its key and value
+_PAIR_CACHE_ENTRY_BYTES = 160
+
+
+class _PairCache:
+    """Least recently used Var(E[Y|Xi, Xj]) of pairs of binned columns.
+
+    Keys are digests of the codes of both columns, of the output and the
+    number of bins: pairs of unchanged columns are found again when inputs
+    are added or removed. The bytes held by the keys, values and entries are
+    bounded.
+    """
+
+    def __init__(self, max_bytes: int = 2**25):
+        self.max_bytes = max_bytes
+        self._values = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _nbytes(key: bytes, value: np.ndarray) -> int:
+        return sys.getsizeof(key) + sys.getsizeof(value) + _PAIR_CACHE_ENTRY_BYTES
+
+    def get(self, key: bytes) -> np.ndarray | None:
+        with self._lock:
+            value = self._values.get(key)
+            if value is not None:
+                self._values.move_to_end(key)
+            return value
+
+    def set(self, key: bytes, value: np.ndarray) -> None:
+        with self._lock:
+            if key in self._values:
+                return
+            self._values[key] = value
+            self._size += self._nbytes(key, value)
+            self._evict()
+
+    def resize(self, max_bytes: int) -> None:
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._size > max(self.max_bytes, 0):
+            key, evicted = self._values.popitem(last=False)
+            self._size -= self._nbytes(key, evicted)
+
+
+_pair_cache = _PairCache()
+
+
+def set_soe_cache(max_bytes: int = 2**25) -> None:
+    """Size of the cache of the second-order effects of pairs of factors.
+
+    `sensitivity_indices` keeps Var(E[Y|Xi, Xj]) of the pairs it computes,
+    keyed by digests of the binned columns and of the output. When inputs
+    are added to or removed from an analysis, only the pairs involving new
+    columns are computed again.
+
+    Parameters
+    ----------
+    max_bytes : int, default 2**25
+        Memory held by the cache, about 350 bytes per pair and output. The
+        least recently used pairs are evicted beyond it. 0 disables and
+        empties the cache.
+
+    """
+    _pair_cache.resize(max_bytes)
+
+
+def _digest(array: np.ndarray) -> bytes:
+    h = blake2b(f"{array.dtype.str}{array.shape}".encode(), digest_size=16)
+    h.update(np.ascontiguousarray(array).data)
+    return h.digest()
+
+
+def _memoized_pair_conditional_vars(
+    codes: np.ndarray,
+    output: np.ndarray,
+    n_bins: int,
+    pairs: list[tuple[int, int]],
+    compute: Callable[[list[tuple[int, int]]], np.ndarray],
+) -> np.ndarray:
+    """Var(E[Y|Xi, Xj]) of `pairs`, with `compute` only for uncached pairs.
+
+    Digests cost a pass over the codes of each factor and over the output,
+    binning costs a pass per pair.
+    """
+    if _pair_cache.max_bytes <= 0:
+        return compute(pairs)
+
+    prefix = _digest(output) + n_bins.to_bytes(8, "little")
+    factors = {i for pair in pairs for i in pair}
+    digests = {i: _digest(codes[i]) for i in factors}
+    keys = [prefix + digests[i] + digests[j] for i, j in pairs]
+
+    var_ij = np.empty((len(pairs), output.shape[1]))
+    missing = []
+    for k, key in enumerate(keys):
+        value = _pair_cache.get(key)
+        if value is None:
+            missing.append(k)
+        else:
+            var_ij[k] = value
+    if missing:
+        var_ij[missing] = compute([pairs[k] for k in missing])
+        for k in missing:
+            _pair_cache.set(keys[k], var_ij[k].copy())
+    return var_ij
+
+
+def _to_shared_memory(
+    array: np.ndarray,
+) -> tuple[shared_memory.SharedMemory, tuple[str, tuple[int, ...], str]]:
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+
+def _init_soe_worker(
+    codes_spec: tuple, output_spec: tuple, n_bins: int, backend: str
+) -> None:
+    set_backend(backend)
+    for key, (name, shape, dtype) in zip(
+        ["codes", "output"], [codes_spec, output_spec]
+    ):
+        shm = shared_memory.SharedMemory(name=name)
+        _soe_worker_state[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        _soe_worker_state[f"{key}_shm"] = shm  # keep the buffer alive
+    _soe_worker_state["n_bins"] = n_bins
+
+
+def _soe_worker(pairs: list[tuple[int, int]]) -> np.ndarray:
+    return _pair_conditional_vars(
+        _soe_worker_state["codes"],
+        _soe_worker_state["output"],
+        _soe_worker_state["n_bins"],
+        pairs,
+    )
+
+
+def _parallel_pair_conditional_vars(
+    codes: np.ndarray,
+    output: np.ndarray,
+    n_bins: int,
+    pairs: list[tuple[int, int]],
+    n_jobs: int,
+    executor: Literal["thread", "process"],
+) -> np.ndarray:
+    """Spread the pairs over a pool of `n_jobs` workers.
+
+    Processes read the codes and the output from shared memory instead of
+    receiving pickled copies.
+    """
+    n_chunks = min(len(pairs), 4 * n_jobs)
+    chunks = [
+        [tuple(pair) for pair in chunk]
+        for chunk in np.array_split(np.asarray(pairs), n_chunks)
+    ]
+
+    if executor == "thread":
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            var_ij = pool.map(
+                lambda chunk: _pair_conditional_vars(codes, output, n_bins, chunk),
+                chunks,
+            )
+            return np.concatenate(list(var_ij))
+    elif executor == "process":
+        codes_shm, codes_spec = _to_shared_memory(codes)
+        output_shm, output_spec = _to_shared_memory(output)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=n_jobs,
+                initializer=_init_soe_worker,
+                initargs=(codes_spec, output_spec, n_bins, get_backend().name),
+            ) as pool:
+                var_ij = list(pool.map(_soe_worker, chunks))
+        finally:
+            for shm in [codes_shm, output_shm]:
+                shm.close()
+                shm.unlink()
+        return np.concatenate(var_ij)
+    else:
+        raise ValueError("'executor' can only be 'thread' or 'process'")
+
+
 @dataclass
 class SensitivityAnalysisResult:
     si: np.ndarray
     first_order: np.ndarray
     second_order: np.ndarray
+    si_ci: np.ndarray | None = None
+    first_order_ci: np.ndarray | None = None
+    second_order_ci: np.ndarray | None = None
+    skipped_pairs: np.ndarray | None = None
+    n_runs: int | None = None
+    si_uncertainty: np.ndarray | None = None
+    profile: dict | None = None
+
+
+def _print_indices(
+    si: np.ndarray,
+    foe: np.ndarray,
+    soe: np.ndarray,
+    var_names: list[str],
+    output_names: list[str] | None,
+    multi_output: bool,
+) -> None:
+    """Display the indices of each output, stacked along a leading axis."""
+    n_outputs = len(si)
+    if output_names is None:
+        output_names = [f"y{k}" for k in range(n_outputs)]
+    for k in range(n_outputs):
+        df_foe = pd.DataFrame(foe[k], index=var_names, columns=["First-order effect"])
+        df_soe = pd.DataFrame(soe[k], index=var_names, columns=var_names)
+        df_si = pd.DataFrame(si[k], index=var_names, columns=["Combined effect"])
+
+        df_indices = pd.concat([df_foe, df_soe, df_si], axis=1)
+        header = f"{output_names[k]}:\n" if multi_output else ""
+        print(f"\n{header}{df_indices}\n")
+
+
+# Number of runs of the first estimate with a time budget, a power of 2
+_ANYTIME_MIN_RUNS = 2**10
 
 
+def _anytime_sensitivity_indices(
+    inputs: _Columns,
+    output: np.ndarray,
+    *,
+    time_budget: float,
+    rng: np.random.Generator | int | None,
+    **options,
+) -> SensitivityAnalysisResult:
+    """Refine the indices on growing subsamples until `time_budget` is spent.
+
+    Subsamples are nested and stratified on the order of the runs: the first
+    2**m runs of a scrambled Sobol' sequence over [0, 1) fall each in one of
+    2**m strata of equal width. Only the subsamples are read, the cost does not
+    depend on the total number of runs. Each step is 4 times larger than the
+    previous one and is only started if it is expected to end in time.
+    """
+    start = time.perf_counter()
+    rng = np.random.default_rng(rng)
+    engine = qmc.Sobol(d=1, seed=rng)
+    n_runs = len(output)
+
+    res = res_prev = None
+    n_samples = _ANYTIME_MIN_RUNS
+    while True:
+        step_start = time.perf_counter()
+        if n_samples >= n_runs:
+            runs = slice(None)
+        else:
+            engine.reset()
+            u = engine.random_base2(int(np.log2(n_samples)))[:, 0]
+            runs = (u * n_runs).astype(np.intp)
+
+        res_prev, res = res, sensitivity_indices.__wrapped__(
+            inputs.take(runs), output[runs], rng=rng, **options
+        )
+        res.n_runs = min(n_samples, n_runs)
+
+        now = time.perf_counter()
+        if n_samples >= n_runs or now - start + 4 * (now - step_start) > time_budget:
+            break
+        n_samples *= 4
+
+    if res_prev is not None:
+        # standard error assuming a 1/sqrt(n) convergence: with nested
+        # subsamples, Var(si_prev - si) = (4 - 1) Var(si)
+        res.si_uncertainty = np.abs(res.si - res_prev.si) / np.sqrt(3)
+    return res
+
+
+@_profiled
 def sensitivity_indices(
     inputs: pd.DataFrame | np.ndarray,
     output: pd.DataFrame | np.ndarray,
     print_indices: bool = False,
+    n_jobs: int | None = None,
+    executor: Literal["thread", "process"] = "process",
+    n_bootstrap: int | None = None,
+    confidence_level: float = 0.95,
+    rng: np.random.Generator | int | None = None,
+    soe_method: Literal["pairs", "onehot"] = "pairs",
+    soe_threshold: float | None = None,
+    soe_top_k: int | None = None,
+    time_budget: float | None = None,
+    dtype: str | np.dtype | None = None,
+    domains: dict | list | None = None,
+    *,
+    profile: bool = False,
 ) -> SensitivityAnalysisResult:
     """Sensitivity indices.
 
@@ -49,11 +652,69 @@ def sensitivity_indices(
     Parameters
     ----------
     inputs : ndarray or DataFrame of shape (n_runs, n_factors)
-        Input variables.
-    output : ndarray or DataFrame of shape (n_runs, 1)
-        Target variable.
+        Input variables. PyArrow and Polars tables are also accepted. Numeric
+        columns are used without copy, the others are coded as categories.
+        Paths to ``.npy`` and Arrow IPC files are memory mapped and read one
+        column at a time.
+    output : ndarray or DataFrame of shape (n_runs, 1) or (n_runs, n_outputs)
+        Target variable. With several outputs, the input binning is shared and
+        the indices of all outputs are computed in a single pass. Can also be
+        a path as for `inputs`.
     print_indices : bool, default False
         If True, displays computed indices.
+    n_jobs : int, optional
+        Number of workers used to compute the second-order effects of the
+        pairs of factors, at least 1. ``-1`` uses all CPUs. Sequential by
+        default.
+    executor : {"thread", "process"}, default "process"
+        Pool used when `n_jobs` is more than 1. Processes access the binned
+        inputs and the output through shared memory.
+    n_bootstrap : int, optional
+        Number of bootstrap replicates used to compute confidence intervals.
+        Runs are split in random groups binned once, and each replicate
+        re-weights the binned statistics of the groups. No confidence
+        intervals by default.
+    confidence_level : float, default 0.95
+        Confidence level of the intervals.
+    rng : Generator or int, optional
+        Random number generator, or seed, for the bootstrap.
+    soe_method : {"pairs", "onehot"}, default "pairs"
+        Computation of the second-order effects. ``"pairs"`` bins each pair of
+        factors in turn. ``"onehot"`` obtains the joint statistics of all pairs
+        at once with matrix products of the one-hot encoding of the bins,
+        which is faster with many factors.
+    soe_threshold : float, optional
+        Screening of the second-order effects. Only pairs of factors with a
+        first-order effect of at least `soe_threshold` are computed, the
+        others are set to 0.
+    soe_top_k : int, optional
+        Screening of the second-order effects. Only pairs among the
+        `soe_top_k` factors with the largest first-order effects are
+        computed, the others are set to 0.
+    time_budget : float, optional
+        Time budget in seconds. The indices are first estimated on a
+        subsample of 1024 runs stratified on the order of the runs, then
+        refined on nested subsamples 4 times larger as long as the next
+        refinement is expected to end within the budget. The estimate of the
+        largest subsample is returned. The first estimate is always computed.
+    dtype : {"float32", "float64"}, optional
+        Precision of the inputs and output. ``"float32"`` halves the memory
+        and bandwidth of the binning for data simulated in single precision:
+        columns are converted one at a time if needed and the per-bin sums and
+        variances are still accumulated in double precision. By default,
+        floating point data keep their precision.
+    domains : dict or list, optional
+        Known domain of the inputs, by column name or in the order of the
+        columns, e.g. for designs of `scipy.stats.qmc`. A domain is either
+        bounds ``(low, high)``, used as the range of the bins instead of
+        scanning the column, or a distribution with ``cdf`` and ``ppf``
+        methods, e.g. ``scipy.stats.norm()``: the column is binned in
+        equal-probability bins through its CDF. Values outside of the bounds
+        raise a ValueError.
+    profile : bool, default False
+        Record the wall time in seconds, the peak of allocated bytes and the
+        number of calls of each phase of the computation, see also
+        `set_profile_hook`.
 
     Returns
     -------
@@ -67,6 +728,35 @@ def sensitivity_indices(
         soe : ndarray of shape (n_factors, n_factors)
             Second-order effects (also called 'interaction').
 
+        skipped_pairs : ndarray of shape (n_skipped, 2), optional
+            With screening, pairs of factors whose second-order effect was
+            not computed.
+        si_ci, first_order_ci, second_order_ci : ndarray, optional
+            With `n_bootstrap`, lower and upper bounds of the percentile
+            bootstrap confidence intervals, stacked along a leading axis of
+            size 2, e.g. ``si_ci`` is of shape (2, n_factors).
+
+        n_runs : int, optional
+            With `time_budget`, number of runs used for the estimate.
+        si_uncertainty : ndarray, optional
+            With `time_budget`, rough standard error of `si` from its change
+            since the previous subsample, assuming a 1/sqrt(n_runs)
+            convergence. None if the first subsample was the last.
+        profile : dict, optional
+            With `profile`, statistics of each phase, e.g.
+            ``profile["first_order"]["wall_time"]``. Phases are
+            "input_conversion", "first_order", "second_order", "bootstrap"
+            and "total", and "categorical_coding" with categorical inputs.
+
+        With several outputs, each attribute is stacked along a leading
+        axis of size n_outputs, e.g. ``si`` is of shape (n_outputs, n_factors).
+
+    Notes
+    -----
+    The second-order effects of each pair of factors are cached: adding or
+    removing an input only computes the pairs involving new columns, see
+    `set_soe_cache`.
+
     Examples
     --------
     >>> import numpy as np
@@ -99,105 +789,159 @@ def sensitivity_indices(
     array([0.43157591, 0.44241433, 0.11767249])
 
     """
-    # Handle inputs conversion
-    if isinstance(inputs, pd.DataFrame):
-        var_names = inputs.columns.tolist()
-        cat_cols = inputs.select_dtypes(include=["category", "O", "string"]).columns
-        if not cat_cols.empty:
-            inputs = inputs.copy()  # Avoid SettingWithCopyWarning
-            inputs[cat_cols] = inputs[cat_cols].apply(
-                lambda x: x.astype("category").cat.codes
+    with _phase("input_conversion"):
+        dtype = _float_dtype(dtype)
+        inputs = _as_columns(inputs).astype(dtype)
+        var_names = inputs.names
+        domains = _as_domains(domains, var_names)
+        # Outputs are stacked as columns, (N,) and (N, 1) are a single output
+        output, output_names = _as_output(output)
+        if dtype is not None:
+            output = output.astype(dtype, copy=False)
+        multi_output = output.shape[1] > 1
+
+    if n_jobs is not None and n_jobs != -1 and n_jobs < 1:
+        raise ValueError("'n_jobs' must be a positive integer, -1 or None")
+
+    if time_budget is not None:
+        res = _anytime_sensitivity_indices(
+            inputs,
+            output if multi_output else output[:, 0],
+            time_budget=time_budget,
+            rng=rng,
+            n_jobs=n_jobs,
+            executor=executor,
+            n_bootstrap=n_bootstrap,
+            confidence_level=confidence_level,
+            soe_method=soe_method,
+            soe_threshold=soe_threshold,
+            soe_top_k=soe_top_k,
+            domains=domains,
+        )
+        if print_indices:
+            n_factors = len(inputs)
+            _print_indices(
+                np.reshape(res.si, (-1, n_factors)),
+                np.reshape(res.first_order, (-1, n_factors)),
+                np.reshape(res.second_order, (-1, n_factors, n_factors)),
+                var_names,
+                output_names,
+                multi_output,
             )
-        inputs = inputs.to_numpy()
-    else:
-        inputs = np.asarray(inputs)
-        # Fallback names if it's just a numpy array
-        var_names = [f"x{i}" for i in range(inputs.shape[1])]
-
-    # Handle output conversion first, then flatten
-    if isinstance(output, (pd.DataFrame, pd.Series)):
-        output = output.to_numpy()
+        return res
 
-    # Flatten output if it's (N, 1)
-    output = output.flatten()
-
-    n_runs, n_factors = inputs.shape
+    n_runs, n_factors = len(output), len(inputs)
+    n_outputs = output.shape[1]
     n_bins_foe, n_bins_soe = number_of_bins(n_runs, n_factors)
-
-    # Overall variance of the output
-    var_y = np.var(output)
-
-    si = np.empty(n_factors)
-    foe = np.empty(n_factors)
-    soe = np.zeros((n_factors, n_factors))
-
+    n_bins_foe, n_bins_soe = int(n_bins_foe), int(n_bins_soe)
+
+    # Overall variance of the output, accumulated in double precision
+    var_y = np.var(output, axis=0, dtype=np.float64)
+
+    # Digitize each column once per resolution along with its binned statistics
+    # 1. First-order effects (FOE): Var(E[Y|Xi])
+    # 2. Second-order effects (SOE)
+    # Marginal Var(E[Y|Xi]) using n_bins_soe to match MATLAB logic
+    backend = get_backend()
+    # the first-order codes are only resampled by the bootstrap
+    codes_foe = None
+    if n_bootstrap is not None:
+        codes_foe = np.empty((n_factors, n_runs), dtype=np.min_scalar_type(n_bins_foe))
+    codes_soe = np.empty((n_factors, n_runs), dtype=np.min_scalar_type(n_bins_soe))
+    var_foe = np.empty((n_factors, n_outputs))
+    var_soe = np.empty((n_factors, n_outputs))
     for i in range(n_factors):
-        # 1. First-order effects (FOE)
-        xi = inputs[:, i]
-
-        bin_avg, _, binnumber = stats.binned_statistic(
-            x=xi, values=output, bins=n_bins_foe, statistic="mean"
+        xi, x_range = _domain_values(inputs.data[i], domains[i])
+        with _phase("first_order"):
+            codes, counts, sums = backend.binned_statistics(
+                xi, _bin_edges(xi, n_bins_foe, x_range), output
+            )
+            # runs beyond the bounds of a domain are in none of the bins
+            bounded = domains[i] is not None and not hasattr(domains[i], "cdf")
+            if bounded and counts.sum() != n_runs:
+                low, high = x_range
+                raise ValueError(f"Inputs must be within the bounds [{low}, {high}].")
+            if codes_foe is not None:
+                codes_foe[i] = codes
+            var_foe[i] = _binned_var(counts, sums)
+        with _phase("second_order"):
+            codes_soe[i], counts, sums = backend.binned_statistics(
+                xi, _bin_edges(xi, n_bins_soe, x_range), output
+            )
+            var_soe[i] = _binned_var(counts, sums)
+
+    # Var(E[Y|Xi, Xj]) on the joint n_bins_soe x n_bins_soe grid
+    pairs = [(i, j) for i in range(n_factors) for j in range(i + 1, n_factors)]
+    skipped_pairs = None
+    if soe_threshold is not None or soe_top_k is not None:
+        pairs, skipped_pairs = _screen_pairs(
+            var_foe / var_y, threshold=soe_threshold, top_k=soe_top_k
+        )
+    if soe_method not in {"pairs", "onehot"}:
+        raise ValueError("'soe_method' can only be 'pairs' or 'onehot'")
+    if n_jobs == -1:
+        n_jobs = os.cpu_count()
+
+    def pair_conditional_vars(pairs):
+        if soe_method == "onehot":
+            return _onehot_pair_conditional_vars(codes_soe, output, n_bins_soe, pairs)
+        elif n_jobs is None or n_jobs == 1 or len(pairs) < 2:
+            return _pair_conditional_vars(codes_soe, output, n_bins_soe, pairs)
+        return _parallel_pair_conditional_vars(
+            codes_soe,
+            output,
+            n_bins_soe,
+            pairs,
+            n_jobs=n_jobs,
+            executor=executor,
         )
 
-        # Filter empty bins and get weights (counts)
-        mask_foe = ~np.isnan(bin_avg)
-        mean_i_foe = bin_avg[mask_foe]
-        # binnumber starts at 1; 0 is for values outside range
-        bin_counts_foe = np.unique(binnumber[binnumber > 0], return_counts=True)[1]
-
-        foe[i] = _weighted_var(mean_i_foe, weights=bin_counts_foe) / var_y
-
-        # 2. Second-order effects (SOE)
-        for j in range(n_factors):
-            if j <= i:
-                continue
-
-            xj = inputs[:, j]
+    with _phase("second_order"):
+        # pairs of columns binned as in a previous call are looked up
+        var_ij = _memoized_pair_conditional_vars(
+            codes_soe, output, n_bins_soe, pairs, pair_conditional_vars
+        )
 
-            # 2D Binned Statistic for Var(E[Y|Xi, Xj])
-            bin_avg_ij, x_edges, y_edges, binnumber_ij = stats.binned_statistic_2d(
-                x=xi, y=xj, values=output, bins=n_bins_soe, expand_binnumbers=False
+    si, foe, soe = _combine_effects(var_y, var_foe, var_soe, var_ij, pairs)
+
+    if skipped_pairs is not None:
+        # For independent inputs, the variance not explained by the first-order
+        # effects and the computed pairs bounds the skipped interactions
+        bound = np.max(1 - foe.sum(axis=1) - soe.sum(axis=(1, 2)) / 2)
+        if soe_threshold is not None:
+            tolerance = soe_threshold
+        else:
+            tolerance = foe[:, np.unique(np.asarray(pairs, dtype=int))].min(
+                initial=np.inf
             )
-
-            mask_ij = ~np.isnan(bin_avg_ij)
-            mean_ij = bin_avg_ij[mask_ij]
-            counts_ij = np.unique(binnumber_ij[binnumber_ij > 0], return_counts=True)[1]
-            var_ij = _weighted_var(mean_ij, weights=counts_ij)
-
-            # Marginal Var(E[Y|Xi]) using n_bins_soe to match MATLAB logic
-            bin_avg_i_soe, _, binnumber_i_soe = stats.binned_statistic(
-                x=xi, values=output, bins=n_bins_soe, statistic="mean"
+        if len(skipped_pairs) > 0 and bound > tolerance:
+            warnings.warn(
+                f"Skipped second-order effects can explain up to {bound:.3f} of "
+                "the variance. Consider relaxing the screening.",
+                stacklevel=3,
             )
-            mask_i = ~np.isnan(bin_avg_i_soe)
-            counts_i = np.unique(
-                binnumber_i_soe[binnumber_i_soe > 0], return_counts=True
-            )[1]
-            var_i_soe = _weighted_var(bin_avg_i_soe[mask_i], weights=counts_i)
-
-            # Marginal Var(E[Y|Xj]) using n_bins_soe to match MATLAB logic
-            bin_avg_j_soe, _, binnumber_j_soe = stats.binned_statistic(
-                x=xj, values=output, bins=n_bins_soe, statistic="mean"
+        skipped_pairs = np.asarray(skipped_pairs, dtype=int).reshape(-1, 2)
+
+    cis = [None, None, None]
+    if n_bootstrap is not None:
+        with _phase("bootstrap"):
+            cis = _bootstrap_intervals(
+                codes_foe,
+                codes_soe,
+                output,
+                n_bins_foe=n_bins_foe,
+                n_bins_soe=n_bins_soe,
+                pairs=pairs,
+                n_bootstrap=n_bootstrap,
+                confidence_level=confidence_level,
+                rng=rng,
             )
-            mask_j = ~np.isnan(bin_avg_j_soe)
-            counts_j = np.unique(
-                binnumber_j_soe[binnumber_j_soe > 0], return_counts=True
-            )[1]
-            var_j_soe = _weighted_var(bin_avg_j_soe[mask_j], weights=counts_j)
-
-            soe[i, j] = (var_ij - var_i_soe - var_j_soe) / var_y
-
-    # Mirror SOE and calculate Combined Effect (SI)
-    # SI is FOE + half of all interactions associated with that variable
-    soe = soe + soe.T
-    for k in range(n_factors):
-        si[k] = foe[k] + (soe[:, k].sum() / 2)
 
     if print_indices:
-        df_foe = pd.DataFrame(foe, index=var_names, columns=["First-order effect"])
-        df_soe = pd.DataFrame(soe, index=var_names, columns=var_names)
-        df_si = pd.DataFrame(si, index=var_names, columns=["Combined effect"])
+        _print_indices(si, foe, soe, var_names, output_names, multi_output)
 
-        df_indices = pd.concat([df_foe, df_soe, df_si], axis=1)
-        print(f"\n{df_indices}\n")
+    if not multi_output:
+        si, foe, soe = si[0], foe[0], soe[0]
+        cis = [ci if ci is None else ci[:, 0] for ci in cis]
 
-    return SensitivityAnalysisResult(si, foe, soe)
+    return SensitivityAnalysisResult(si, foe, soe, *cis, skipped_pairs=skipped_pairs)
@@ -0,0 +1,886 @@
+from collections.abc import Iterable, Sequence
+import copy
+import os
+from typing import Literal
+
+import numpy as np
+import pandas as pd
+
+from simdec.backends import get_backend
+from simdec.decomposition import _STATISTICS, DecompositionResult, ScenarioIndexer
+from simdec.ingestion import _as_output
+from simdec.sensitivity_indices import (
+    SensitivityAnalysisResult,
+    _binned_var,
+    _combine_effects,
+    _range_edges,
+    number_of_bins,
+)
+
+
+__all__ = [
+    "sensitivity_indices_streaming",
+    "SensitivityStatistics",
+    "SensitivityAccumulator",
+    "decomposition_streaming",
+    "ScenarioStatistics",
+]
+
+
+def _as_chunk(
+    inputs: pd.DataFrame | np.ndarray, output: pd.DataFrame | np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Numeric inputs (n_runs, n_factors) and output (n_runs, n_outputs)."""
+    if isinstance(inputs, pd.DataFrame):
+        inputs = inputs.to_numpy()
+    if isinstance(output, (pd.DataFrame, pd.Series)):
+        output = output.to_numpy()
+
+    inputs = np.asarray(inputs)
+    output = np.asarray(output)
+    return inputs, output.reshape(len(output), -1)
+
+
+class SensitivityStatistics:
+    """Binned statistics from which sensitivity indices are computed.
+
+    For every factor, per-bin counts and output sums are kept at the
+    first-order and second-order resolutions, as well as for every pair of
+    factors on the joint second-order grid. Memory is proportional to the
+    number of bins, not to the number of runs.
+
+    Statistics computed on separate shards of runs with the same bin edges can
+    be merged, and saved to or loaded from a compact ``.npz`` file. This
+    allows map-reduce computations where only the statistics are transferred.
+
+    Parameters
+    ----------
+    edges_foe : list of ndarray
+        For each factor, edges of the first-order bins.
+    edges_soe : list of ndarray
+        For each factor, edges of the second-order bins.
+    n_outputs : int, default 1
+        Number of outputs.
+
+    """
+
+    # accumulated arrays, besides the number of runs
+    _statistics = (
+        "shift",
+        "sum_y",
+        "sum_y2",
+        "counts_foe",
+        "sums_foe",
+        "counts_soe",
+        "sums_soe",
+        "counts_pairs",
+        "sums_pairs",
+    )
+
+    def __init__(
+        self,
+        edges_foe: list[np.ndarray],
+        edges_soe: list[np.ndarray],
+        n_outputs: int = 1,
+    ):
+        self.edges_foe = [np.asarray(edges, dtype=float) for edges in edges_foe]
+        self.edges_soe = [np.asarray(edges, dtype=float) for edges in edges_soe]
+        self.n_outputs = n_outputs
+
+        n_factors = len(self.edges_foe)
+        n_bins_foe = len(self.edges_foe[0]) - 1
+        n_bins_soe = len(self.edges_soe[0]) - 1
+        self.pairs = [(i, j) for i in range(n_factors) for j in range(i + 1, n_factors)]
+
+        self.n_runs = 0
+        # output is shifted by its first observed mean to keep sums well-conditioned
+        self.shift = np.zeros(n_outputs)
+        self.sum_y = np.zeros(n_outputs)
+        self.sum_y2 = np.zeros(n_outputs)
+
+        self.counts_foe = np.zeros((n_factors, n_bins_foe), dtype=np.int64)
+        self.sums_foe = np.zeros((n_factors, n_bins_foe, n_outputs))
+        self.counts_soe = np.zeros((n_factors, n_bins_soe), dtype=np.int64)
+        self.sums_soe = np.zeros((n_factors, n_bins_soe, n_outputs))
+        self.counts_pairs = np.zeros((len(self.pairs), n_bins_soe**2), dtype=np.int64)
+        self.sums_pairs = np.zeros((len(self.pairs), n_bins_soe**2, n_outputs))
+
+    @classmethod
+    def from_bounds(
+        cls, bounds: list[tuple[float, float]], n_runs: int, n_outputs: int = 1
+    ) -> "SensitivityStatistics":
+        """Bins spanning declared bounds, sized for a total of `n_runs`."""
+        n_bins_foe, n_bins_soe = number_of_bins(n_runs, len(bounds))
+        n_bins_foe, n_bins_soe = int(n_bins_foe), int(n_bins_soe)
+        return cls(
+            edges_foe=[_range_edges(low, high, n_bins_foe) for low, high in bounds],
+            edges_soe=[_range_edges(low, high, n_bins_soe) for low, high in bounds],
+            n_outputs=n_outputs,
+        )
+
+    @property
+    def n_bins_soe(self) -> int:
+        return len(self.edges_soe[0]) - 1
+
+    def _binned_statistics(
+        self, x: np.ndarray, edges: np.ndarray, output: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if np.any(x < edges[0]) or np.any(x > edges[-1]):
+            raise ValueError(
+                f"Inputs must be within the bounds [{edges[0]}, {edges[-1]}]."
+            )
+        return get_backend().binned_statistics(x, edges, output)
+
+    def update(
+        self, inputs: pd.DataFrame | np.ndarray, output: pd.DataFrame | np.ndarray
+    ) -> "SensitivityStatistics":
+        """Accumulate a chunk of runs.
+
+        Parameters
+        ----------
+        inputs : ndarray or DataFrame of shape (n_runs, n_factors)
+            Numeric input variables.
+        output : ndarray or DataFrame of shape (n_runs,) or (n_runs, n_outputs)
+            Target variable.
+
+        """
+        inputs, output = _as_chunk(inputs, output)
+        if len(output) == 0:
+            return self
+
+        if self.n_runs == 0:
+            self.shift = output.mean(axis=0)
+        output = output - self.shift
+
+        self.n_runs += len(output)
+        self.sum_y += output.sum(axis=0)
+        self.sum_y2 += (output**2).sum(axis=0)
+
+        codes_soe = []
+        for i, (edges_foe, edges_soe) in enumerate(zip(self.edges_foe, self.edges_soe)):
+            xi = inputs[:, i]
+
+            _, counts, sums = self._binned_statistics(xi, edges_foe, output)
+            self.counts_foe[i] += counts
+            self.sums_foe[i] += sums
+
+            codes, counts, sums = self._binned_statistics(xi, edges_soe, output)
+            self.counts_soe[i] += counts
+            self.sums_soe[i] += sums
+            codes_soe.append(codes)
+
+        pair_statistics = get_backend().pair_statistics
+        for k, (i, j) in enumerate(self.pairs):
+            counts, sums = pair_statistics(
+                codes_soe[i], codes_soe[j], self.n_bins_soe, output
+            )
+            self.counts_pairs[k] += counts
+            self.sums_pairs[k] += sums
+
+        return self
+
+    def _shifted(self, shift: np.ndarray) -> "SensitivityStatistics":
+        """Copy with sums expressed relative to another output shift."""
+        other = copy.deepcopy(self)
+        delta = self.shift - shift
+
+        other.shift = shift
+        other.sum_y2 = self.sum_y2 + 2 * delta * self.sum_y + self.n_runs * delta**2
+        other.sum_y = self.sum_y + self.n_runs * delta
+        other.sums_foe = self.sums_foe + self.counts_foe[..., np.newaxis] * delta
+        other.sums_soe = self.sums_soe + self.counts_soe[..., np.newaxis] * delta
+        other.sums_pairs = self.sums_pairs + self.counts_pairs[..., np.newaxis] * delta
+        return other
+
+    def merge(self, other: "SensitivityStatistics") -> "SensitivityStatistics":
+        """Combine with statistics of other runs accumulated on the same bins.
+
+        Parameters
+        ----------
+        other : SensitivityStatistics
+            Statistics of another shard of runs.
+
+        Returns
+        -------
+        merged : SensitivityStatistics
+            Statistics of the runs of both shards.
+
+        """
+        same_bins = (
+            len(self.edges_foe) == len(other.edges_foe)
+            and self.n_outputs == other.n_outputs
+            and all(
+                np.array_equal(a, b)
+                for a, b in zip(
+                    self.edges_foe + self.edges_soe, other.edges_foe + other.edges_soe
+                )
+            )
+        )
+        if not same_bins:
+            raise ValueError("Statistics can only be merged with identical bins.")
+
+        if self.n_runs == 0:
+            return copy.deepcopy(other)
+
+        merged = copy.deepcopy(self)
+        other = other._shifted(self.shift)
+        merged.n_runs += other.n_runs
+        for name in self._statistics[1:]:
+            setattr(merged, name, getattr(merged, name) + getattr(other, name))
+        return merged
+
+    def save(self, file: str | os.PathLike) -> None:
+        """Save the statistics to a compressed ``.npz`` file."""
+        np.savez_compressed(
+            file,
+            edges_foe=np.stack(self.edges_foe),
+            edges_soe=np.stack(self.edges_soe),
+            n_runs=self.n_runs,
+            **{name: getattr(self, name) for name in self._statistics},
+        )
+
+    @classmethod
+    def load(cls, file: str | os.PathLike) -> "SensitivityStatistics":
+        """Load statistics saved with :meth:`save`."""
+        with np.load(file) as data:
+            stats = cls(
+                edges_foe=list(data["edges_foe"]),
+                edges_soe=list(data["edges_soe"]),
+                n_outputs=data["sum_y"].shape[0],
+            )
+            stats.n_runs = int(data["n_runs"])
+            for name in cls._statistics:
+                setattr(stats, name, data[name])
+        return stats
+
+    def result(self) -> SensitivityAnalysisResult:
+        """Sensitivity indices of the runs accumulated so far."""
+        mean_y = self.sum_y / self.n_runs
+        var_y = self.sum_y2 / self.n_runs - mean_y**2
+
+        var_foe = np.array(
+            [_binned_var(c, s) for c, s in zip(self.counts_foe, self.sums_foe)]
+        )
+        var_soe = np.array(
+            [_binned_var(c, s) for c, s in zip(self.counts_soe, self.sums_soe)]
+        )
+        var_ij = np.array(
+            [_binned_var(c, s) for c, s in zip(self.counts_pairs, self.sums_pairs)]
+        ).reshape(len(self.pairs), self.n_outputs)
+
+        si, foe, soe = _combine_effects(var_y, var_foe, var_soe, var_ij, self.pairs)
+        if self.n_outputs == 1:
+            si, foe, soe = si[0], foe[0], soe[0]
+
+        return SensitivityAnalysisResult(si, foe, soe)
+
+
+def _aggregation_matrix(n_fine: int, n_bins: int) -> np.ndarray:
+    """One-hot map of equal-width fine bins onto `n_bins` coarser bins.
+
+    Each fine bin goes to the coarse bin containing its centre. The map is
+    exact when `n_bins` divides `n_fine`.
+    """
+    centres = (np.arange(n_fine) + 0.5) / n_fine
+    coarse = np.minimum((centres * n_bins).astype(int), n_bins - 1)
+    return np.eye(n_bins)[coarse]
+
+
+class SensitivityAccumulator:
+    """Online sensitivity indices as new runs arrive.
+
+    The number of bins used by :func:`sensitivity_indices` depends on the
+    number of runs. The accumulator therefore keeps statistics on fine
+    equal-width bins, and re-aggregates them to the bins matching the current
+    number of runs in :meth:`result`. Updating costs a pass over the new runs
+    only, and computing the result is independent of the number of runs.
+
+    Parameters
+    ----------
+    bounds : list of tuple of float
+        Lower and upper bounds of each input.
+    n_outputs : int, default 1
+        Number of outputs.
+    n_fine_foe : int, default 2520
+        Number of fine bins for the first-order effects.
+    n_fine_soe : int, default 60
+        Number of fine bins for the second-order effects. Memory grows with
+        ``n_factors**2 * n_fine_soe**2``.
+
+    Notes
+    -----
+    With few runs, e.g. up to 3,500 runs of 4 factors, :func:`number_of_bins`
+    returns 10 first-order and 4 second-order bins, which divide the default
+    numbers of fine bins: indices are then the same as with
+    :func:`sensitivity_indices_streaming`. With more runs, the number of
+    first-order bins is above 30 and grows with the number of runs, and it
+    mostly does not divide the fine bins. Each fine bin is then assigned to
+    the bin containing its centre, which moves the edges of the bins by at
+    most half a fine bin: 0.02% of the range of the inputs for the
+    first-order bins and 0.8% for the second-order bins with the defaults.
+    Indices are approximate, with errors of the order of 1e-4 for smooth
+    models. The number of bins is capped by the number of fine bins.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import simdec as sd
+    >>> rng = np.random.default_rng()
+    >>> acc = sd.SensitivityAccumulator(bounds=[(0, 1)] * 3)
+    >>> for _ in range(10):
+    ...     inputs = rng.random((1000, 3))
+    ...     output = inputs[:, 0] + inputs[:, 1] * inputs[:, 2]
+    ...     res = acc.update(inputs, output).result()
+
+    """
+
+    def __init__(
+        self,
+        bounds: list[tuple[float, float]],
+        n_outputs: int = 1,
+        n_fine_foe: int = 2520,
+        n_fine_soe: int = 60,
+    ):
+        self.bounds = bounds
+        self.fine = SensitivityStatistics(
+            edges_foe=[_range_edges(low, high, n_fine_foe) for low, high in bounds],
+            edges_soe=[_range_edges(low, high, n_fine_soe) for low, high in bounds],
+            n_outputs=n_outputs,
+        )
+
+    @property
+    def n_runs(self) -> int:
+        return self.fine.n_runs
+
+    def update(
+        self, inputs: pd.DataFrame | np.ndarray, output: pd.DataFrame | np.ndarray
+    ) -> "SensitivityAccumulator":
+        """Accumulate a batch of new runs.
+
+        See :meth:`SensitivityStatistics.update`.
+        """
+        self.fine.update(inputs, output)
+        return self
+
+    def statistics(self) -> SensitivityStatistics:
+        """Statistics on the bins matching the current number of runs."""
+        fine = self.fine
+        n_fine_foe = fine.counts_foe.shape[1]
+        n_fine_soe = fine.n_bins_soe
+
+        n_bins_foe, n_bins_soe = number_of_bins(self.n_runs, len(self.bounds))
+        n_bins_foe = min(int(n_bins_foe), n_fine_foe)
+        n_bins_soe = min(int(n_bins_soe), n_fine_soe)
+
+        stats = SensitivityStatistics(
+            edges_foe=[_range_edges(lo, hi, n_bins_foe) for lo, hi in self.bounds],
+            edges_soe=[_range_edges(lo, hi, n_bins_soe) for lo, hi in self.bounds],
+            n_outputs=fine.n_outputs,
+        )
+        stats.n_runs = fine.n_runs
+        stats.shift = fine.shift
+        stats.sum_y = fine.sum_y
+        stats.sum_y2 = fine.sum_y2
+
+        agg_foe = _aggregation_matrix(n_fine_foe, n_bins_foe)
+        stats.counts_foe = np.rint(fine.counts_foe @ agg_foe).astype(np.int64)
+        stats.sums_foe = np.einsum("kfo,fb->kbo", fine.sums_foe, agg_foe)
+
+        agg_soe = _aggregation_matrix(n_fine_soe, n_bins_soe)
+        stats.counts_soe = np.rint(fine.counts_soe @ agg_soe).astype(np.int64)
+        stats.sums_soe = np.einsum("kfo,fb->kbo", fine.sums_soe, agg_soe)
+
+        n_pairs = len(fine.pairs)
+        counts_pairs = fine.counts_pairs.reshape(n_pairs, n_fine_soe, n_fine_soe)
+        counts_pairs = np.einsum("pfg,fa,gb->pab", counts_pairs, agg_soe, agg_soe)
+        stats.counts_pairs = np.rint(counts_pairs).astype(np.int64)
+        stats.counts_pairs = stats.counts_pairs.reshape(n_pairs, n_bins_soe**2)
+
+        sums_pairs = fine.sums_pairs.reshape(n_pairs, n_fine_soe, n_fine_soe, -1)
+        sums_pairs = np.einsum("pfgo,fa,gb->pabo", sums_pairs, agg_soe, agg_soe)
+        stats.sums_pairs = sums_pairs.reshape(n_pairs, n_bins_soe**2, -1)
+
+        return stats
+
+    def result(self) -> SensitivityAnalysisResult:
+        """Sensitivity indices of the runs accumulated so far."""
+        return self.statistics().result()
+
+
+def _sketch(
+    chunks: Iterable[tuple[pd.DataFrame | np.ndarray, pd.DataFrame | np.ndarray]],
+) -> tuple[list[tuple[float, float]], int]:
+    """Bounds of each input and total number of runs in one pass."""
+    x_min = x_max = None
+    n_runs = 0
+    for inputs, output in chunks:
+        inputs, _ = _as_chunk(inputs, output)
+        if len(inputs) == 0:
+            continue
+        n_runs += len(inputs)
+        if x_min is None:
+            x_min, x_max = inputs.min(axis=0), inputs.max(axis=0)
+        else:
+            x_min = np.minimum(x_min, inputs.min(axis=0))
+            x_max = np.maximum(x_max, inputs.max(axis=0))
+
+    if n_runs == 0:
+        raise ValueError("'chunks' does not contain any run.")
+
+    return list(zip(x_min, x_max)), n_runs
+
+
+def sensitivity_indices_streaming(
+    chunks: Iterable[tuple[pd.DataFrame | np.ndarray, pd.DataFrame | np.ndarray]],
+    *,
+    bounds: list[tuple[float, float]] | None = None,
+    n_runs: int | None = None,
+) -> SensitivityAnalysisResult:
+    """Sensitivity indices over chunks of runs.
+
+    Out-of-core version of :func:`sensitivity_indices`: chunks are consumed one
+    at a time and only binned statistics are kept in memory. Bins are fixed
+    before accumulating, either from the declared `bounds` and `n_runs` or from
+    a first pass over `chunks`. With the bounds of the data, results match
+    :func:`sensitivity_indices` on the concatenated chunks.
+
+    Parameters
+    ----------
+    chunks : iterable of (inputs, output)
+        Chunks of numeric input variables of shape (n, n_factors) and target
+        variable of shape (n,) or (n, n_outputs), e.g. read from Parquet row
+        groups or CSV chunks. Must be re-iterable, like a list, if `bounds` or
+        `n_runs` is not provided.
+    bounds : list of tuple of float, optional
+        Lower and upper bounds of each input.
+    n_runs : int, optional
+        Total number of runs, used to select the number of bins.
+
+    Returns
+    -------
+    res : SensitivityAnalysisResult
+        See :func:`sensitivity_indices`.
+
+    """
+    if bounds is None or n_runs is None:
+        if iter(chunks) is chunks:
+            raise ValueError(
+                "'chunks' must be re-iterable to compute the bins in a first pass. "
+                "Otherwise provide 'bounds' and 'n_runs'."
+            )
+        bounds_, n_runs_ = _sketch(chunks)
+        bounds = bounds_ if bounds is None else bounds
+        n_runs = n_runs_ if n_runs is None else n_runs
+
+    stats = None
+    for inputs, output in chunks:
+        inputs, output = _as_chunk(inputs, output)
+        if stats is None:
+            stats = SensitivityStatistics.from_bounds(
+                bounds, n_runs=n_runs, n_outputs=output.shape[1]
+            )
+        stats.update(inputs, output)
+
+    if stats is None:
+        raise ValueError("'chunks' does not contain any run.")
+    return stats.result()
+
+
+def _histogram_quantile(
+    histogram: np.ndarray, edges: np.ndarray, q: float
+) -> np.ndarray:
+    """Quantile `q` of each row of `histogram`, uniform within each bin."""
+    counts = histogram.sum(axis=1)
+    cumulative = np.cumsum(histogram, axis=1)
+    target = q * counts
+    # first bin reaching the target, the target is 0 for q = 0
+    k = np.argmax(cumulative >= np.maximum(target, 1)[:, np.newaxis], axis=1)
+    rows = np.arange(len(histogram))
+    before = cumulative[rows, k] - histogram[rows, k]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = np.clip((target - before) / histogram[rows, k], 0, 1)
+    res = edges[k] + fraction * (edges[k + 1] - edges[k])
+    return np.where(counts > 0, res, np.nan)
+
+
+def _category_values(categories: pd.Index) -> np.ndarray:
+    """Values of `categories` which can be saved without pickling."""
+    if isinstance(categories.dtype, np.dtype) and categories.dtype.kind in "biufcmM":
+        return categories.to_numpy()
+    return np.asarray(categories, dtype=str)
+
+
+class ScenarioStatistics:
+    """Statistics of the output in each scenario, accumulated over chunks.
+
+    Runs are mapped to the scenarios of a fitted `ScenarioIndexer`. For
+    every scenario, the number of runs, the sum and sum of squares, the
+    minimum and maximum of the output are kept, as well as a histogram of
+    the output on fixed bins. Memory is proportional to the number of
+    scenarios and output bins, not to the number of runs.
+
+    Statistics of separate shards of runs with the same scenarios and output
+    bins can be merged, and saved to or loaded from a ``.npz`` file.
+
+    Parameters
+    ----------
+    indexer : ScenarioIndexer
+        Fitted scenarios, e.g. on a sample of the runs.
+    output_edges : ndarray
+        Edges of the bins of the output histogram. Outputs beyond the edges
+        are counted in the first or last bin.
+
+    Notes
+    -----
+    The count, mean, standard deviation, minimum and maximum of each
+    scenario are exact. Quantiles are interpolated in the histogram, assuming
+    uniform outputs within a bin: their error is below the width of a bin.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import simdec as sd
+    >>> rng = np.random.default_rng()
+    >>> inputs = rng.random((1000, 2))
+    >>> indexer = sd.ScenarioIndexer().fit(inputs, [0.6, 0.4])
+    >>> stats = sd.ScenarioStatistics(indexer, np.linspace(0, 2, 101))
+    >>> for _ in range(10):
+    ...     inputs = rng.random((1000, 2))
+    ...     res = stats.update(inputs, inputs.sum(axis=1)).result()
+
+    """
+
+    # accumulated arrays, besides the number of runs
+    _statistics = (
+        "shift",
+        "counts",
+        "n_missing",
+        "sums",
+        "sums2",
+        "minimum",
+        "maximum",
+        "histogram",
+    )
+
+    def __init__(self, indexer: ScenarioIndexer, output_edges: np.ndarray):
+        self.indexer = indexer
+        self.output_edges = np.asarray(output_edges, dtype=float)
+
+        n_scenarios = indexer.n_scenarios
+        self.n_runs = 0
+        # output is shifted by its first observed mean to keep sums well-conditioned
+        self.shift = np.zeros(())
+        self.counts = np.zeros(n_scenarios, dtype=np.int64)
+        self.n_missing = np.zeros(n_scenarios, dtype=np.int64)
+        self.sums = np.zeros(n_scenarios)
+        self.sums2 = np.zeros(n_scenarios)
+        self.minimum = np.full(n_scenarios, np.inf)
+        self.maximum = np.full(n_scenarios, -np.inf)
+        self.histogram = np.zeros(
+            (n_scenarios, len(self.output_edges) - 1), dtype=np.int64
+        )
+
+    @property
+    def n_scenarios(self) -> int:
+        return self.indexer.n_scenarios
+
+    def update(
+        self, inputs: pd.DataFrame | np.ndarray, output: pd.DataFrame | np.ndarray
+    ) -> "ScenarioStatistics":
+        """Accumulate a chunk of runs.
+
+        Parameters
+        ----------
+        inputs : DataFrame of shape (n_runs, n_factors)
+            Input variables with the columns of the reference sample of the
+            indexer.
+        output : ndarray or DataFrame of shape (n_runs,) or (n_runs, 1)
+            Target variable.
+
+        """
+        output, _ = _as_output(output)
+        if output.shape[1] != 1:
+            raise ValueError("Scenario statistics are accumulated for one output")
+        output = output[:, 0].astype(np.float64, copy=False)
+        n_scenarios = self.n_scenarios
+
+        scenarios = self.indexer.transform(inputs)
+        self.n_runs += len(output)
+
+        # runs outside of the scenarios are not counted
+        inside = scenarios < n_scenarios
+        scenarios, output = scenarios[inside].astype(np.intp), output[inside]
+
+        # NaN outputs propagate to the statistic as in `decomposition`
+        missing = np.isnan(output)
+        self.n_missing += np.bincount(scenarios[missing], minlength=n_scenarios)
+        scenarios, output = scenarios[~missing], output[~missing]
+        if len(output) == 0:
+            return self
+
+        if not self.counts.any():
+            self.shift = np.asarray(output.mean())
+        shifted = output - self.shift
+
+        self.counts += np.bincount(scenarios, minlength=n_scenarios)
+        self.sums += np.bincount(scenarios, weights=shifted, minlength=n_scenarios)
+        shifted **= 2
+        self.sums2 += np.bincount(scenarios, weights=shifted, minlength=n_scenarios)
+        np.minimum.at(self.minimum, scenarios, output)
+        np.maximum.at(self.maximum, scenarios, output)
+
+        edges = self.output_edges
+        n_bins = len(edges) - 1
+        codes = get_backend().bin_codes(np.clip(output, edges[0], edges[-1]), edges)
+        codes = scenarios * n_bins + codes
+        self.histogram += np.bincount(codes, minlength=n_scenarios * n_bins).reshape(
+            n_scenarios, n_bins
+        )
+        return self
+
+    def _shifted(self, shift: np.ndarray) -> "ScenarioStatistics":
+        """Copy with sums expressed relative to another output shift."""
+        other = copy.deepcopy(self)
+        delta = self.shift - shift
+
+        other.shift = shift
+        other.sums2 = self.sums2 + 2 * delta * self.sums + self.counts * delta**2
+        other.sums = self.sums + self.counts * delta
+        return other
+
+    def merge(self, other: "ScenarioStatistics") -> "ScenarioStatistics":
+        """Combine with statistics of other runs on the same scenarios.
+
+        Parameters
+        ----------
+        other : ScenarioStatistics
+            Statistics of another shard of runs.
+
+        Returns
+        -------
+        merged : ScenarioStatistics
+            Statistics of the runs of both shards.
+
+        """
+        indexer, other_indexer = self.indexer, other.indexer
+        same_bins = (
+            indexer.var_names == other_indexer.var_names
+            and indexer.states == other_indexer.states
+            and np.array_equal(self.output_edges, other.output_edges)
+            and all(
+                np.array_equal(a, b)
+                for a, b in zip(indexer.bin_edges, other_indexer.bin_edges)
+            )
+            and indexer.categories.keys() == other_indexer.categories.keys()
+            and all(
+                indexer.categories[name].equals(other_indexer.categories[name])
+                for name in indexer.categories
+            )
+        )
+        if not same_bins:
+            raise ValueError(
+                "Statistics can only be merged with identical scenarios and bins."
+            )
+
+        if not self.counts.any():
+            merged = copy.deepcopy(other)
+            merged.n_runs += self.n_runs
+            merged.n_missing = merged.n_missing + self.n_missing
+            return merged
+
+        merged = copy.deepcopy(self)
+        other = other._shifted(self.shift)
+        merged.n_runs += other.n_runs
+        merged.minimum = np.minimum(merged.minimum, other.minimum)
+        merged.maximum = np.maximum(merged.maximum, other.maximum)
+        for name in ("counts", "n_missing", "sums", "sums2", "histogram"):
+            setattr(merged, name, getattr(merged, name) + getattr(other, name))
+        return merged
+
+    def save(self, file: str | os.PathLike) -> None:
+        """Save the statistics and the scenarios to a compressed ``.npz`` file.
+
+        Boolean, numeric and datetime categories keep their dtype, other
+        categories are saved as strings.
+        """
+        indexer = self.indexer
+        categories = {
+            f"categories_{i}": _category_values(indexer.categories[name])
+            for i, name in enumerate(indexer.var_names)
+            if name in indexer.categories
+        }
+        np.savez_compressed(
+            file,
+            var_names=np.asarray(indexer.var_names),
+            states=np.asarray(indexer.states),
+            bin_edges=np.concatenate(indexer.bin_edges),
+            output_edges=self.output_edges,
+            n_runs=self.n_runs,
+            **categories,
+            **{name: getattr(self, name) for name in self._statistics},
+        )
+
+    @classmethod
+    def load(cls, file: str | os.PathLike) -> "ScenarioStatistics":
+        """Load statistics saved with :meth:`save`."""
+        with np.load(file) as data:
+            indexer = ScenarioIndexer()
+            indexer.var_names = data["var_names"].tolist()
+            indexer.states = data["states"].tolist()
+            splits = np.cumsum(np.add(indexer.states, 1))[:-1]
+            indexer.bin_edges = np.split(data["bin_edges"], splits)
+            indexer.categories = {
+                name: pd.Index(data[f"categories_{i}"])
+                for i, name in enumerate(indexer.var_names)
+                if f"categories_{i}" in data
+            }
+
+            stats = cls(indexer, data["output_edges"])
+            stats.n_runs = int(data["n_runs"])
+            for name in cls._statistics:
+                setattr(stats, name, data[name])
+        return stats
+
+    def summary(self, quantiles: Sequence[float] = (0.25, 0.5, 0.75)) -> pd.DataFrame:
+        """Statistics of the output in each scenario.
+
+        See the `summary` of :func:`decomposition`. Quantiles are
+        interpolated in the histogram of each scenario.
+        """
+        counts = self.counts
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = self.sums / counts
+            squares = np.maximum(self.sums2 - self.sums * mean, 0)
+            std = np.where(counts > 1, np.sqrt(squares / (counts - 1)), np.nan)
+        mean += self.shift
+
+        empty = counts == 0
+        minimum = np.where(empty, np.nan, self.minimum)
+        maximum = np.where(empty, np.nan, self.maximum)
+
+        summary = {"count": counts, "mean": mean, "std": std, "min": minimum}
+        for q in sorted({*quantiles, 0.5}):
+            quantile = _histogram_quantile(self.histogram, self.output_edges, q)
+            summary[f"{100 * q:g}%"] = np.clip(quantile, minimum, maximum)
+        summary["max"] = maximum
+        return pd.DataFrame(summary)
+
+    def result(
+        self,
+        statistic: Literal["mean", "median"] = "mean",
+        quantiles: Sequence[float] = (0.25, 0.5, 0.75),
+    ) -> DecompositionResult:
+        """Decomposition of the runs accumulated so far.
+
+        Parameters
+        ----------
+        statistic : {"mean", "median"}, default "mean"
+            Statistic of each scenario. The median is interpolated in the
+            histogram.
+        quantiles : sequence of float, default (0.25, 0.5, 0.75)
+            Quantiles of the output in each scenario, added to the `summary`.
+
+        Returns
+        -------
+        res : DecompositionResult
+            See :func:`decomposition_streaming`.
+
+        """
+        if statistic not in _STATISTICS:
+            raise ValueError(f"'statistic' must be one of {_STATISTICS}")
+        if not all(0 <= q <= 1 for q in quantiles):
+            raise ValueError("'quantiles' must be between 0 and 1")
+
+        summary = self.summary(quantiles)
+        statistic_ = summary["mean" if statistic == "mean" else "50%"].to_numpy()
+        # NaN propagate to the statistic as with `decomposition`
+        statistic_ = np.where(self.n_missing > 0, np.nan, statistic_)
+
+        indexer = self.indexer
+        return DecompositionResult(
+            var_names=indexer.var_names,
+            statistic=statistic_.reshape(indexer.states),
+            states=indexer.states,
+            bin_edges=indexer.bin_edges,
+            scenarios=None,
+            output=None,
+            summary=summary,
+            histogram=(self.histogram, self.output_edges),
+        )
+
+
+def decomposition_streaming(
+    chunks: Iterable[tuple[pd.DataFrame | np.ndarray, pd.DataFrame | np.ndarray]],
+    *,
+    indexer: ScenarioIndexer,
+    output_bounds: tuple[float, float] | None = None,
+    n_output_bins: int = 200,
+    statistic: Literal["mean", "median"] = "mean",
+    quantiles: Sequence[float] = (0.25, 0.5, 0.75),
+) -> DecompositionResult:
+    """SimDec decomposition over chunks of runs.
+
+    Out-of-core version of :func:`decomposition`: chunks are consumed one at
+    a time and mapped to the fixed scenarios of `indexer`, only statistics of
+    each scenario are kept in memory. The result feeds `visualization`, as a
+    stacked histogram, and `tableau` without the runs.
+
+    Parameters
+    ----------
+    chunks : iterable of (inputs, output)
+        Chunks of input variables of shape (n, n_factors), with the columns
+        of the reference sample of `indexer`, and target variable of shape
+        (n,). Must be re-iterable, like a list, if `output_bounds` is not
+        provided.
+    indexer : ScenarioIndexer
+        Scenarios fitted on a reference sample, e.g. the first chunk.
+    output_bounds : tuple of float, optional
+        Lower and upper bounds of the output histogram. By default, the
+        range of the output in a first pass over `chunks`.
+    n_output_bins : int, default 200
+        Number of bins of the output histogram.
+    statistic : {"mean", "median"}, default "mean"
+        Statistic to compute in each scenario.
+    quantiles : sequence of float, default (0.25, 0.5, 0.75)
+        Quantiles of the output in each scenario, added to the `summary`.
+
+    Returns
+    -------
+    res : DecompositionResult
+        See :func:`decomposition`. The runs are not kept: `scenarios` and
+        `output` are None and `histogram` holds the output histogram of
+        each scenario. Quantiles, and the median statistic, are interpolated
+        in the histogram. See :class:`ScenarioStatistics`.
+
+    Examples
+    --------
+    >>> import simdec as sd
+    >>> indexer = sd.ScenarioIndexer().fit(inputs, si)  # doctest: +SKIP
+    >>> res = sd.decomposition_streaming(chunks, indexer=indexer)  # doctest: +SKIP
+    >>> sd.visualization(decomposition=res, palette=palette)  # doctest: +SKIP
+
+    """
+    if output_bounds is None:
+        if iter(chunks) is chunks:
+            raise ValueError(
+                "'chunks' must be re-iterable to compute the output bounds in a "
+                "first pass. Otherwise provide 'output_bounds'."
+            )
+        output_min, output_max = np.inf, -np.inf
+        for _, output in chunks:
+            output, _ = _as_output(output)
+            if output.size:
+                output_min = min(output_min, np.nanmin(output))
+                output_max = max(output_max, np.nanmax(output))
+        if output_min > output_max:
+            raise ValueError("'chunks' does not contain any run.")
+        output_bounds = (output_min, output_max)
+
+    low, high = output_bounds
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    stats = ScenarioStatistics(indexer, np.linspace(low, high, n_output_bins + 1))
+    for inputs, output in chunks:
+        stats.update(inputs, output)
+
+    return stats.result(statistic=statistic, quantiles=quantiles)
@@ -142,9 +142,54 @@ def palette(
     return np.concatenate(colors).tolist()
 
 
+def _single_output(decomposition: DecompositionResult) -> DecompositionResult:
+    """`decomposition` if it has a single output, otherwise raise."""
+    if isinstance(decomposition.summary, list):
+        names = decomposition.output_names or list(range(len(decomposition.summary)))
+        raise ValueError(
+            f"'decomposition' has several outputs {names}, select one with "
+            "'decomposition.select_output'"
+        )
+    return decomposition
+
+
+def _scenario_runs(decomposition: DecompositionResult) -> pd.DataFrame:
+    """Scenario and output of the runs, scenarios labelled as in the plots.
+
+    The runs outside of the scenarios are dropped. Scenarios are numbered
+    from n_scenarios down to 1 for the stacking order.
+    """
+    n_scenarios = decomposition.statistic.size
+    inside = decomposition.scenarios < n_scenarios
+    return pd.DataFrame(
+        {
+            "scenario": n_scenarios - decomposition.scenarios[inside],
+            "output": decomposition.output[inside],
+        }
+    )
+
+
+def _scenario_histogram(decomposition: DecompositionResult) -> pd.DataFrame:
+    """Output bins of a streamed decomposition weighted by their count.
+
+    Scenarios are labelled as in `_scenario_runs`, each output bin is
+    represented by its centre.
+    """
+    counts, edges = decomposition.histogram
+    n_scenarios = len(counts)
+    scenarios, bins = np.nonzero(counts)
+    return pd.DataFrame(
+        {
+            "scenario": n_scenarios - scenarios,
+            "output": (edges[bins] + edges[bins + 1]) / 2,
+            "weight": counts[scenarios, bins],
+        }
+    )
+
+
 def visualization(
     *,
-    bins: pd.DataFrame,
+    bins: pd.DataFrame | None = None,
     palette: list[list[float]],
     n_bins: str | int = "auto",
     kind: Literal["histogram", "boxplot"] = "histogram",
@@ -156,12 +201,14 @@ def visualization(
 
     Parameters
     ----------
-    bins : DataFrame
-        Multidimensional bins.
+    bins : DataFrame, optional
+        Multidimensional bins. If None, the scenarios and output of
+        `decomposition` are plotted without building the bins.
     palette : list of int of size (n, 4)
         List of colours corresponding to scenarios.
     n_bins : str or int
-        Number of bins or method from `np.histogram_bin_edges`.
+        Number of bins or method from `np.histogram_bin_edges`. The bins of
+        the histogram of a streamed `decomposition` are used instead.
     kind: {"histogram", "boxplot"}
         Histogram or Box Plot.
     ax : Axes, optional
@@ -169,7 +216,7 @@ def visualization(
     print_legend: Boolean, optional
         Prints plot legend.
     decomposition: DecompositionResult, optional
-        Required for print_legend.
+        Required for print_legend, or without `bins`.
 
     Returns
     -------
@@ -177,12 +224,45 @@ def visualization(
         Matplotlib axis.
 
     """
-    # needed to get the correct stacking order
-    bins.columns = pd.RangeIndex(start=len(bins.columns), stop=0, step=-1)
+    if decomposition is not None:
+        decomposition = _single_output(decomposition)
+
+    if bins is not None:
+        # needed to get the correct stacking order
+        bins.columns = pd.RangeIndex(start=len(bins.columns), stop=0, step=-1)
+        data, scenarios = bins, list(bins.columns)
+        hist_vars, box_vars = {}, {}
+    elif decomposition is not None and decomposition.histogram is not None:
+        # streamed decomposition, the runs are not kept
+        data = _scenario_histogram(decomposition)
+        scenarios = list(range(decomposition.statistic.size, 0, -1))
+        hist_vars = {
+            "x": "output",
+            "hue": "scenario",
+            "hue_order": scenarios,
+            "weights": "weight",
+        }
+        n_bins = decomposition.histogram[1].tolist()
+        box_vars = None
+    elif decomposition is not None:
+        data = _scenario_runs(decomposition)
+        scenarios = list(range(decomposition.statistic.size, 0, -1))
+        hist_vars = {"x": "output", "hue": "scenario", "hue_order": scenarios}
+        # colours in the order of the boxes, as without hue
+        box_vars = {
+            "x": "output",
+            "y": "scenario",
+            "hue": "scenario",
+            "hue_order": scenarios[::-1],
+            "legend": False,
+        }
+    else:
+        raise ValueError("'bins' or 'decomposition' is required")
 
     if kind == "histogram":
         ax = sns.histplot(
-            bins,
+            data,
+            **hist_vars,
             multiple="stack",
             stat="probability",
             palette=palette,
@@ -193,11 +273,14 @@ def visualization(
             ax=ax,
         )
     elif kind == "boxplot":
+        if box_vars is None:
+            raise ValueError("'boxplot' requires the runs, not kept when streaming")
         ax = sns.boxplot(
-            bins,
+            data,
+            **box_vars,
             palette=palette,
             orient="h",
-            order=list(bins.columns)[::-1],
+            order=scenarios[::-1],
             ax=ax,
         )
     else:
@@ -222,8 +305,8 @@ def visualization(
                 var_names=decomposition.var_names,
                 statistic=decomposition.statistic,
                 states=decomposition.states,
-                bins=decomposition.bins,
                 palette=palette,
+                decomposition=decomposition,
             )
             display(styler)
 
@@ -232,8 +315,8 @@ def visualization(
 
 def two_output_visualization(
     *,
-    bins: pd.DataFrame,
-    bins2: pd.DataFrame,
+    bins: pd.DataFrame | None = None,
+    bins2: pd.DataFrame | None = None,
     palette: list[list[float]],
     n_bins: str | int = "auto",
     output_name: str = "Output 1",
@@ -254,9 +337,10 @@ def two_output_visualization(
 
     Parameters
     ----------
-    bins : DataFrame
-        Multidimensional bins for the primary output.
-    bins2 : DataFrame
+    bins : DataFrame, optional
+        Multidimensional bins for the primary output. If None, the first two
+        outputs of `decomposition` are plotted without building the bins.
+    bins2 : DataFrame, optional
         Multidimensional bins for the secondary output.
     palette : list of int of size (n, 4)
         List of colours corresponding to scenarios.
@@ -275,7 +359,8 @@ def two_output_visualization(
     print_legend: Boolean, optional
         Prints plot legend.
     decomposition: DecompositionResult, optional
-        Required for print_legend.
+        Required for print_legend, or without `bins` and `bins2` with at least
+        two outputs. The legend is the table of the first output.
 
     Returns
     -------
@@ -283,28 +368,57 @@ def two_output_visualization(
     axs : ndarray of shape (2, 2)
 
     """
+    if bins is None or bins2 is None:
+        if decomposition is None or not isinstance(decomposition.summary, list):
+            raise ValueError(
+                "'bins' and 'bins2' or a 'decomposition' of two outputs is required"
+            )
+
     fig, axs = plt.subplots(2, 2, sharex="col", sharey="row", figsize=(8, 8))
 
     axs[0, 1].axis("off")
 
-    visualization(bins=bins.copy(), palette=palette, n_bins=n_bins, ax=axs[0, 0])
+    if bins is not None and bins2 is not None:
+        visualization(bins=bins.copy(), palette=palette, n_bins=n_bins, ax=axs[0, 0])
+
+        # Match the ordering visualization() uses
+        bins_plot = bins.copy()
+        bins_plot.columns = pd.RangeIndex(start=len(bins_plot.columns), stop=0, step=-1)
+        bins2_plot = bins2.copy()
+        bins2_plot.columns = pd.RangeIndex(
+            start=len(bins2_plot.columns), stop=0, step=-1
+        )
+
+        data = pd.concat([pd.melt(bins_plot), pd.melt(bins2_plot)["value"]], axis=1)
+        data.columns = ["c", "x", "y"]
+        hue_order = sorted(data["c"].unique())
+    else:
+        visualization(
+            palette=palette,
+            n_bins=n_bins,
+            ax=axs[0, 0],
+            decomposition=decomposition.select_output(0),
+        )
+
+        # the runs of the scenarios, labelled as in visualization()
+        n_scenarios = int(np.prod(decomposition.states))
+        inside = decomposition.scenarios < n_scenarios
+        data = pd.DataFrame(
+            {
+                "c": n_scenarios - decomposition.scenarios[inside],
+                "x": decomposition.output[0][inside],
+                "y": decomposition.output[1][inside],
+            }
+        )
+        hue_order = list(range(1, n_scenarios + 1))
+
     if xlim is not None:
         axs[0, 0].set_xlim(xlim)
     axs[0, 0].set_box_aspect(1)
     axs[0, 0].axis("off")
 
-    # Match the ordering visualization() uses
-    bins_plot = bins.copy()
-    bins_plot.columns = pd.RangeIndex(start=len(bins_plot.columns), stop=0, step=-1)
-    bins2_plot = bins2.copy()
-    bins2_plot.columns = pd.RangeIndex(start=len(bins2_plot.columns), stop=0, step=-1)
-
-    data = pd.concat([pd.melt(bins_plot), pd.melt(bins2_plot)["value"]], axis=1)
-    data.columns = ["c", "x", "y"]
     if r_scatter < 1.0:
         data = data.sample(frac=r_scatter)
-
-    hue_order = sorted(data["c"].unique())
     sns.scatterplot(
         data=data,
         x="x",
@@ -358,12 +472,13 @@ def two_output_visualization(
                 stacklevel=2,
             )
         else:
+            decomposition = decomposition.select_output(0)
             _, styler = tableau(
                 var_names=decomposition.var_names,
                 statistic=decomposition.statistic,
                 states=decomposition.states,
-                bins=decomposition.bins,
                 palette=palette[::-1],
+                decomposition=decomposition,
             )
             display(styler)
 
@@ -375,8 +490,9 @@ def tableau(
     var_names: list[str],
     statistic: np.ndarray,
     states: list[int | list[str]],
-    bins: pd.DataFrame,
+    bins: pd.DataFrame | None = None,
     palette: np.ndarray,
+    decomposition: DecompositionResult | None = None,
 ) -> tuple[pd.DataFrame, Styler]:
     """Generate a table of statistics for all scenarios.
 
@@ -390,10 +506,13 @@ def tableau(
         For each variable, number of states. Can either be a scalar or a list.
 
         ``states=[2, 2]`` or ``states=[['a', 'b'], ['low', 'high']]``
-    bins : DataFrame
-        Multidimensional bins.
+    bins : DataFrame, optional
+        Multidimensional bins. If None, the statistics are read from the
+        `summary` of `decomposition`.
     palette : list of int of size (n, 4)
         Ordered list of colours corresponding to each state.
+    decomposition : DecompositionResult, optional
+        Required without `bins`.
 
     Returns
     -------
@@ -402,7 +521,12 @@ def tableau(
     styler : Styler
         Object to style the table with colours and formatting.
     """
-    table = bins.describe(percentiles=[0.5]).T
+    if bins is not None:
+        table = bins.describe(percentiles=[0.5]).T
+    elif decomposition is not None:
+        table = _single_output(decomposition).summary
+    else:
+        raise ValueError("'bins' or 'decomposition' is required")
 
     # get the index out to use a state id/colour
     table = table.reset_index()
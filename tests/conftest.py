@@ -0,0 +1,13 @@
+import pathlib
+
+import pandas as pd
+import pytest
+
+path_data = pathlib.Path(__file__).parent / "data"
+
+
+@pytest.fixture
+def stress_data():
+    data = pd.read_csv(path_data / "stress.csv")
+    output_name, *v_names = list(data.columns)
+    return data[v_names], data[output_name]
@@ -0,0 +1,115 @@
+import pathlib
+import sys
+
+import numpy as np
+import numpy.testing as npt
+import pandas as pd
+import pytest
+
+import simdec as sd
+from simdec.backends import _numba_backend, _numpy_backend
+from simdec.sensitivity_indices import _bin_edges
+
+path_data = pathlib.Path(__file__).parent / "data"
+
+
+@pytest.fixture(autouse=True)
+def no_soe_cache():
+    # second-order effects are computed by each call being compared
+    sd.set_soe_cache(0)
+    yield
+    sd.set_soe_cache()
+
+
+@pytest.fixture
+def numba_backend():
+    pytest.importorskip("numba")
+    yield sd.set_backend("numba")
+    sd.set_backend("numpy")
+
+
+@pytest.mark.parametrize(
+    "x",
+    [
+        np.array([0.0, 1.0, 2.0, 3.0, 3.0]),
+        np.linspace(0, 1, 101),
+        np.linspace(0, 1, 101, dtype=np.float32),
+        np.arange(10),
+        np.full(5, 2.0),
+        np.random.default_rng(0).random(1000) * 1e-9,
+        np.random.default_rng(0).normal(size=1000) * 1e6,
+    ],
+)
+def test_numba_bin_codes(numba_backend, x):
+    output = np.stack([x, x**2], axis=1).astype(float)
+    edges = _bin_edges(x, 7)
+    numpy_backend = _numpy_backend()
+
+    codes = numba_backend.bin_codes(x, edges)
+    codes_ref = numpy_backend.bin_codes(x, edges)
+    npt.assert_array_equal(codes, codes_ref)
+    assert codes.dtype == codes_ref.dtype
+
+    stats = numba_backend.binned_statistics(x, edges, output)
+    stats_ref = numpy_backend.binned_statistics(x, edges, output)
+    for stat, stat_ref in zip(stats, stats_ref):
+        npt.assert_allclose(stat, stat_ref)
+
+    stats = numba_backend.pair_statistics(codes, codes[::-1], 7, output)
+    stats_ref = numpy_backend.pair_statistics(codes, codes[::-1], 7, output)
+    for stat, stat_ref in zip(stats, stats_ref):
+        npt.assert_allclose(stat, stat_ref)
+
+
+@pytest.mark.parametrize("backend", ["numpy", "numba"])
+def test_bin_statistics_outside_edges(backend):
+    if backend == "numba":
+        pytest.importorskip("numba")
+    backend = (_numpy_backend if backend == "numpy" else _numba_backend)()
+    x = np.array([-1.0, 0.0, 0.5, 1.0, 2.0])
+    output = x[:, np.newaxis] ** 2
+    edges = np.linspace(0, 1, 3)
+
+    # values beyond the edges are not counted
+    codes, counts, sums = backend.binned_statistics(x, edges, output)
+    npt.assert_array_equal(counts, [1, 2])
+    npt.assert_allclose(sums[:, 0], [0, 1.25])
+    counts, sums = backend.bin_statistics(codes, output, 2)
+    npt.assert_array_equal(counts, [1, 2])
+
+    # nor are pairs with one of the codes beyond the edges
+    counts, sums = backend.pair_statistics(codes, codes[::-1], 2, output)
+    npt.assert_array_equal(counts, [0, 1, 1, 1])
+    npt.assert_allclose(sums[:, 0], [0, 0, 1, 0.25])
+
+
+def test_numba_sensitivity_indices(numba_backend):
+    data = pd.read_csv(path_data / "stress.csv")
+    output_name, *v_names = list(data.columns)
+    inputs, output = data[v_names], data[output_name]
+
+    res = sd.sensitivity_indices(inputs=inputs, output=output)
+    sd.set_backend("numpy")
+    res_ref = sd.sensitivity_indices(inputs=inputs, output=output)
+
+    npt.assert_allclose(res.si, res_ref.si, atol=1e-14)
+    npt.assert_allclose(res.first_order, res_ref.first_order, atol=1e-14)
+    npt.assert_allclose(res.second_order, res_ref.second_order, atol=1e-14)
+
+
+def test_set_backend(monkeypatch):
+    assert sd.get_backend().name == "numpy"
+
+    with pytest.raises(ValueError, match="can only be one of"):
+        sd.set_backend("cupy")
+
+    # numba not installed
+    monkeypatch.setitem(sys.modules, "numba", None)
+    monkeypatch.delitem(sys.modules, "simdec._numba_kernels", raising=False)
+    monkeypatch.delattr(sd, "_numba_kernels", raising=False)
+    with pytest.raises(ImportError):
+        _numba_backend()
+    with pytest.warns(UserWarning, match="falling back to 'numpy'"):
+        backend = sd.set_backend("numba")
+    assert backend.name == "numpy"
+    assert sd.get_backend() is backend
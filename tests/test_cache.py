@@ -0,0 +1,197 @@
+import importlib.metadata
+import os
+
+import numpy as np
+import numpy.testing as npt
+import pandas as pd
+import pytest
+from scipy import stats
+
+import simdec as sd
+from simdec.cache import _array_digests
+
+
+def test_cache_sensitivity_indices(stress_data, tmp_path):
+    inputs, output = stress_data
+    cache = sd.ResultCache(directory=tmp_path)
+    sensitivity_indices = cache.cached(sd.sensitivity_indices)
+
+    res = sensitivity_indices(inputs=inputs, output=output)
+    assert len(list(tmp_path.glob("*.pkl"))) == 1
+    assert sensitivity_indices(inputs, output) is res
+
+    # same key for equal data, different key for other parameters
+    key = cache.key(sd.sensitivity_indices, inputs.copy(), output.copy())
+    assert key == cache.key(sd.sensitivity_indices, inputs=inputs, output=output)
+    assert key != cache.key(sd.sensitivity_indices, inputs, output, n_bootstrap=10)
+    assert key != cache.key(sd.sensitivity_indices, inputs, output * 2)
+    assert key != cache.key(sd.sensitivity_indices, inputs.to_numpy(), output)
+
+    # from disk
+    cache = sd.ResultCache(directory=tmp_path)
+    res_disk = cache.cached(sd.sensitivity_indices)(inputs, output)
+    assert res_disk is not res
+    npt.assert_array_equal(res_disk.si, res.si)
+    npt.assert_array_equal(res_disk.second_order, res.second_order)
+
+
+def test_cache_default(stress_data, tmp_path, monkeypatch):
+    inputs, output = stress_data
+    monkeypatch.setenv("SIMDEC_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(sd.cache, "_default_cache", None)
+
+    res = sd.cache.sensitivity_indices(inputs=inputs, output=output)
+    assert sd.cache.get_cache().directory == tmp_path
+    assert sd.cache.sensitivity_indices(inputs=inputs, output=output) is res
+
+
+def test_cache_decomposition(stress_data, tmp_path):
+    inputs, output = stress_data
+    si = np.array([0.04, 0.50, 0.11, 0.28])
+    cache = sd.ResultCache(directory=tmp_path, max_items=0)
+    decomposition = cache.cached(sd.decomposition)
+
+    res = decomposition(inputs=inputs, output=output, sensitivity_indices=si)
+    res_disk = decomposition(inputs=inputs, output=output, sensitivity_indices=si)
+
+    assert res_disk is not res
+    assert res_disk.var_names == res.var_names
+    npt.assert_array_equal(res_disk.statistic, res.statistic)
+    pd.testing.assert_frame_equal(res_disk.bins, res.bins)
+
+
+def test_cache_eviction(tmp_path):
+    cache = sd.ResultCache(directory=tmp_path, max_items=1)
+    cache.set("key0", np.full(100, 0))
+    cache.max_bytes = 3 * (tmp_path / "key0.pkl").stat().st_size
+
+    for i in range(1, 4):
+        cache.set(f"key{i}", np.full(100, i))
+    assert cache.get("key0") is None
+
+    cache.get("key1")  # most recently used
+    cache.set("key4", np.full(100, 4))
+
+    files = sorted(path.stem for path in tmp_path.glob("*.pkl"))
+    assert files == ["key1", "key3", "key4"]
+    npt.assert_array_equal(cache.get("key1"), np.full(100, 1))
+
+    cache.clear()
+    assert cache.get("key4") is None
+    assert list(tmp_path.glob("*.pkl")) == []
+
+
+def test_cache_read_only_digest(tmp_path):
+    h = sd.ResultCache(directory=tmp_path, max_bytes=0)
+    array = np.arange(10.0)
+    h.key(sd.sensitivity_indices, array, array)
+    assert id(array) not in _array_digests
+
+    array.flags.writeable = False
+    key = h.key(sd.sensitivity_indices, array, array)
+    assert id(array) in _array_digests
+    assert key == h.key(sd.sensitivity_indices, array.copy(), array)
+
+    array_id = id(array)
+    del array
+    assert array_id not in _array_digests
+
+
+def test_cache_print_indices(stress_data, tmp_path, capsys):
+    inputs, output = stress_data
+    sensitivity_indices = sd.ResultCache(directory=tmp_path).cached(
+        sd.sensitivity_indices
+    )
+
+    sensitivity_indices(inputs, output, print_indices=True)
+    printed = capsys.readouterr().out
+    assert "Combined effect" in printed
+
+    # a hit displays the indices again, a call without printing shares the entry
+    sensitivity_indices(inputs, output, print_indices=True)
+    assert capsys.readouterr().out == printed
+    sensitivity_indices(inputs, output)
+    assert capsys.readouterr().out == ""
+    assert len(list(tmp_path.glob("*.pkl"))) == 1
+
+
+def test_cache_paths(stress_data, tmp_path):
+    inputs, output = stress_data
+    path_inputs, path_output = tmp_path / "inputs.npy", tmp_path / "output.npy"
+    np.save(path_inputs, inputs.to_numpy())
+    np.save(path_output, output.to_numpy())
+    cache = sd.ResultCache(directory=tmp_path / "cache")
+
+    key = cache.key(sd.sensitivity_indices, path_inputs, path_output)
+    assert key == cache.key(sd.sensitivity_indices, path_inputs, path_output)
+
+    # rewritten file
+    np.save(path_output, 2 * output.to_numpy())
+    os.utime(path_output, ns=(0, 0))
+    assert key != cache.key(sd.sensitivity_indices, path_inputs, path_output)
+
+    # paths given as strings are identified by their file as well
+    key = cache.key(sd.sensitivity_indices, str(path_inputs), str(path_output))
+    np.save(path_output, output.to_numpy())
+    os.utime(path_output, ns=(1, 1))
+    assert key != cache.key(sd.sensitivity_indices, str(path_inputs), str(path_output))
+
+
+@pytest.mark.parametrize("library", ["pyarrow", "polars"])
+def test_cache_tables(library, tmp_path):
+    lib = pytest.importorskip(library)
+    inputs = pd.DataFrame(np.random.default_rng(42).random((1_000, 3)))
+    inputs.columns = ["a", "b", "c"]
+    other = inputs.copy()
+    other.iloc[500, 0] = -1.0
+    if library == "pyarrow":
+        tables = lib.Table.from_pandas(inputs), lib.Table.from_pandas(other)
+    else:
+        tables = lib.from_pandas(inputs), lib.from_pandas(other)
+    cache = sd.ResultCache(directory=tmp_path)
+
+    # tables differing only in their middle rows
+    key = cache.key(sd.sensitivity_indices, tables[0], inputs["a"])
+    assert key == cache.key(sd.sensitivity_indices, tables[0], inputs["a"])
+    assert key != cache.key(sd.sensitivity_indices, tables[1], inputs["a"])
+
+
+def test_cache_domains_and_unknown_types(stress_data, tmp_path):
+    inputs, output = stress_data
+    si = np.array([0.04, 0.50, 0.11, 0.28])
+    cache = sd.ResultCache(directory=tmp_path)
+
+    # frozen distributions are hashed by value, not by address
+    keys = [
+        cache.key(
+            sd.decomposition,
+            inputs,
+            output,
+            sensitivity_indices=si,
+            domains={"R": stats.norm(loc, 1)},
+        )
+        for loc in [0, 0, 1]
+    ]
+    assert keys[0] == keys[1] != keys[2]
+
+    with pytest.raises(TypeError, match="Cannot hash"):
+        cache.key(sd.sensitivity_indices, inputs, output, rng=object())
+
+    # unidentifiable arguments are not cached
+    calls = []
+    cached = cache.cached(lambda x: calls.append(x) or len(calls))
+    assert cached(object()) == 1
+    assert cached(object()) == 2
+    assert list(tmp_path.glob("*.pkl")) == []
+
+
+def test_cache_version(stress_data, tmp_path, monkeypatch):
+    inputs, output = stress_data
+
+    def version(name):
+        raise importlib.metadata.PackageNotFoundError(name)
+
+    # run from a source tree
+    monkeypatch.setattr(importlib.metadata, "version", version)
+    cache = sd.ResultCache(directory=tmp_path)
+    assert cache.key(sd.sensitivity_indices, inputs, output)
@@ -3,10 +3,11 @@ import pathlib
 import numpy as np
 import numpy.testing as npt
 import pandas as pd
+import pytest
+from scipy import stats
 
 import simdec as sd
 
-
 path_data = pathlib.Path(__file__).parent / "data"
 
 
@@ -73,3 +74,259 @@ def test_auto_ordering_si_not_summing_to_one():
     si = np.array([1.80, 0.10, 0.05, 0.05])
     res = sd.decomposition(inputs=inputs, output=output, sensitivity_indices=si)
     assert len(res.var_names) == 1
+
+
+def test_decomposition_float32():
+    fname = path_data / "stress.csv"
+    data = pd.read_csv(fname)
+    output_name, *v_names = list(data.columns)
+    inputs, output = data[v_names], data[output_name]
+    si = np.array([0.04, 0.50, 0.11, 0.28])
+
+    res = sd.decomposition(
+        inputs=inputs, output=output, sensitivity_indices=si, dtype="float32"
+    )
+    # same values in double precision
+    inputs, output = inputs.astype(np.float32), output.astype(np.float32)
+    res_ref = sd.decomposition(
+        inputs=inputs.astype(float), output=output.astype(float), sensitivity_indices=si
+    )
+    assert res.var_names == res_ref.var_names
+    assert (res.bins.dtypes == np.float32).all()
+    npt.assert_allclose(res.statistic, res_ref.statistic, rtol=1e-5)
+
+
+def test_decomposition_domains():
+    rng = np.random.default_rng(48151623)
+    inputs = pd.DataFrame(
+        {"x0": rng.uniform(-1, 1, 10_000), "x1": rng.normal(size=10_000)}
+    )
+    output = inputs["x0"] + 2 * inputs["x1"]
+    si = np.array([0.2, 0.8])
+
+    res = sd.decomposition(
+        inputs=inputs,
+        output=output,
+        sensitivity_indices=si,
+        dec_limit=1,
+        domains={"x0": (-1, 1), "x1": stats.norm()},
+    )
+    assert res.var_names == ["x1", "x0"]
+    npt.assert_allclose(res.bin_edges[1], [-1, -1 / 3, 1 / 3, 1])
+    # infinite ends of the support are the range of the data
+    npt.assert_allclose(
+        res.bin_edges[0],
+        [inputs["x1"].min(), *stats.norm.ppf([1 / 3, 2 / 3]), inputs["x1"].max()],
+    )
+
+    # close to the quantiles of the data
+    res_ref = sd.decomposition(
+        inputs=inputs, output=output, sensitivity_indices=si, dec_limit=1
+    )
+    npt.assert_allclose(res.statistic, res_ref.statistic, atol=0.1)
+
+
+@pytest.mark.parametrize("statistic", ["mean", "median"])
+def test_decomposition_binned_statistic(statistic):
+    rng = np.random.default_rng(2342)
+    inputs = rng.random((5_000, 3))
+    output = inputs @ [1, 2, 3]
+    output[:10] = np.nan
+
+    # runs of x1 beyond 0.8 fall in its last state, the last state of x2 is empty
+    domains = [None, (0, 0.8), (0, 2)]
+    res = sd.decomposition(
+        inputs=inputs,
+        output=output,
+        sensitivity_indices=np.ones(3) / 3,
+        states=[2, 3, 3],
+        auto_ordering=False,
+        statistic=statistic,
+        domains=domains,
+    )
+
+    # NaN propagate as with `np.median`, unlike the "median" of scipy
+    # the outer states extend to infinity
+    clipped = np.column_stack(
+        [np.clip(x, edges[0], edges[-1]) for x, edges in zip(inputs.T, res.bin_edges)]
+    )
+    expected = stats.binned_statistic_dd(
+        clipped,
+        values=output,
+        statistic=lambda values: getattr(np, statistic)(values),
+        bins=res.bin_edges,
+        expand_binnumbers=True,
+    )
+    npt.assert_allclose(res.statistic, expected.statistic, rtol=1e-12)
+    assert np.isnan(res.statistic[..., 2]).all()
+
+    # output of the runs of each scenario, in run order
+    states = expected.binnumber - 1
+    inside = ((states >= 0) & (states < [[2], [3], [3]])).all(axis=0)
+    scenarios = np.ravel_multi_index(states[:, inside], (2, 3, 3))
+    assert res.bins.shape == (np.bincount(scenarios).max(), 18)
+    for scenario, column in res.bins.items():
+        values = output[inside][scenarios == scenario]
+        npt.assert_equal(column.to_numpy()[: len(values)], values)
+        assert column.iloc[len(values) :].isna().all()
+
+
+def test_decomposition_bins_are_lazy():
+    rng = np.random.default_rng(1234)
+    inputs = rng.random((1_000, 2))
+    output = inputs.sum(axis=1)
+
+    res = sd.decomposition(
+        inputs=inputs, output=output, sensitivity_indices=np.array([0.5, 0.5])
+    )
+    assert res.scenarios.shape == (1_000,)
+    assert res.scenarios.dtype == np.uint8
+    assert "bins" not in vars(res)
+
+    bins = res.bins
+    assert res.bins is bins
+    for scenario, column in bins.items():
+        npt.assert_equal(column.dropna(), output[res.scenarios == scenario])
+
+
+def test_decomposition_summary():
+    rng = np.random.default_rng(2342)
+    inputs = rng.random((5_000, 2))
+    output = inputs @ [1, 2]
+    output[:10] = np.nan
+
+    # the last state of x1 is empty
+    res = sd.decomposition(
+        inputs=inputs,
+        output=output,
+        sensitivity_indices=np.array([0.5, 0.5]),
+        states=[2, 3],
+        auto_ordering=False,
+        quantiles=[0.05, 0.95],
+        domains=[None, (0, 1.5)],
+    )
+    expected = res.bins.describe(percentiles=[0.05, 0.5, 0.95]).T
+    pd.testing.assert_frame_equal(res.summary, expected, check_dtype=False)
+
+    with pytest.raises(ValueError, match="'quantiles' must be between 0 and 1"):
+        sd.decomposition(
+            inputs=inputs,
+            output=output,
+            sensitivity_indices=np.array([0.5, 0.5]),
+            quantiles=[50],
+        )
+
+
+def test_decomposition_multi_output():
+    fname = path_data / "stress.csv"
+    data = pd.read_csv(fname)
+    output_name, *v_names = list(data.columns)
+    inputs = data[v_names]
+    outputs = pd.DataFrame(
+        {"y": data[output_name], "y2": np.sqrt(data[output_name]) + inputs["R"]}
+    )
+    si = np.array([0.04, 0.50, 0.11, 0.28])
+
+    res = sd.decomposition(
+        inputs=inputs, output=outputs, sensitivity_indices=si, dec_limit=1
+    )
+    assert res.output_names == ["y", "y2"]
+    assert res.statistic.shape == (2, *res.states)
+    assert res.output.shape == (2, len(inputs))
+    assert len(res.summary) == len(res.bins) == 2
+
+    for k, name in enumerate(res.output_names):
+        expected = sd.decomposition(
+            inputs=inputs, output=outputs[name], sensitivity_indices=si, dec_limit=1
+        )
+        res_k = res.select_output(name)
+        npt.assert_equal(res_k.scenarios, expected.scenarios)
+        npt.assert_equal(res_k.statistic, expected.statistic)
+        npt.assert_equal(res.statistic[k], expected.statistic)
+        pd.testing.assert_frame_equal(res_k.summary, expected.summary)
+        pd.testing.assert_frame_equal(res.bins[k], expected.bins)
+        # the name of a series is kept
+        assert expected.output_names == [name]
+        assert expected.select_output(name) is expected
+
+
+def test_scenario_indexer():
+    fname = path_data / "stress.csv"
+    data = pd.read_csv(fname)
+    output_name, *v_names = list(data.columns)
+    inputs, output = data[v_names], data[output_name]
+    si = np.array([0.04, 0.50, 0.11, 0.28])
+
+    expected = sd.decomposition(
+        inputs=inputs, output=output, sensitivity_indices=si, dec_limit=1
+    )
+    indexer = sd.ScenarioIndexer(dec_limit=1).fit(inputs, si)
+    assert indexer.var_names == expected.var_names
+    assert indexer.n_scenarios == np.prod(expected.states)
+    npt.assert_equal(indexer.transform(inputs), expected.scenarios)
+
+    # chunks are mapped to the scenarios of the reference sample
+    chunks = [
+        indexer.transform(inputs.iloc[start : start + 1_000])
+        for start in range(0, len(inputs), 1_000)
+    ]
+    npt.assert_equal(np.concatenate(chunks), expected.scenarios)
+
+    # values beyond the reference sample fall in the outer states
+    new_inputs = inputs.iloc[::2].copy()
+    new_inputs.iloc[0, 0] = 1e6
+    new_inputs.iloc[1, 0] = -1e6
+    scenarios = indexer.transform(new_inputs)
+    new_inputs.iloc[0, 0] = inputs.iloc[:, 0].max()
+    new_inputs.iloc[1, 0] = inputs.iloc[:, 0].min()
+    npt.assert_equal(indexer.transform(new_inputs), scenarios)
+    new_inputs.iloc[0, 0] = np.nan
+    scenarios = indexer.transform(new_inputs)
+    assert scenarios[0] == indexer.n_scenarios
+
+    res = sd.decomposition(inputs=new_inputs, output=output.iloc[::2], indexer=indexer)
+    npt.assert_equal(res.scenarios, scenarios)
+    for edges, expected_edges in zip(res.bin_edges, expected.bin_edges):
+        npt.assert_equal(edges, expected_edges)
+
+    with pytest.raises(ValueError, match="'sensitivity_indices' is required"):
+        sd.decomposition(inputs=inputs, output=output)
+
+    # no run inside of the scenarios
+    res = sd.decomposition(inputs=inputs * np.nan, output=output, indexer=indexer)
+    assert (res.summary["count"] == 0).all()
+    assert res.summary.drop(columns="count").isna().all().all()
+    assert np.isnan(res.statistic).all()
+
+    # refitting sets the states of the new selection
+    indexer = sd.ScenarioIndexer().fit(inputs, [0.9, 0.05, 0.03, 0.02])
+    assert indexer.states == [3]
+    indexer.fit(inputs, [0.3, 0.3, 0.3, 0.1])
+    expected = sd.ScenarioIndexer().fit(inputs, [0.3, 0.3, 0.3, 0.1])
+    assert indexer.var_names == expected.var_names
+    assert indexer.states == expected.states == [2, 2, 2]
+    assert len(indexer.bin_edges) == 3
+
+
+def test_scenario_indexer_categories():
+    rng = np.random.default_rng(42)
+    inputs = pd.DataFrame(
+        {"x": rng.random(100), "color": rng.choice(["red", "green", "blue"], 100)}
+    )
+    indexer = sd.ScenarioIndexer(auto_ordering=False).fit(inputs, [0.5, 0.5])
+    reference = indexer.transform(inputs)
+
+    # categories appear in another order, "pink" is unknown
+    new_inputs = inputs.iloc[::-1].reset_index(drop=True)
+    npt.assert_equal(indexer.transform(new_inputs), reference[::-1])
+
+    new_inputs.loc[0, "color"] = "pink"
+    scenarios = indexer.transform(new_inputs)
+    assert scenarios[0] == indexer.n_scenarios
+    npt.assert_equal(scenarios[1:], reference[::-1][1:])
+
+    # a column must keep its kind
+    with pytest.raises(ValueError, match="'color' was categorical"):
+        indexer.transform(inputs.assign(color=rng.random(100)))
+    with pytest.raises(ValueError, match="'x' was numeric"):
+        indexer.transform(inputs.assign(x=inputs["color"]))
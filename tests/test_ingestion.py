@@ -0,0 +1,145 @@
+import numpy as np
+import numpy.testing as npt
+import pandas as pd
+import pytest
+
+import simdec as sd
+from simdec.ingestion import _as_columns, _as_output, _LazyData
+
+
+@pytest.fixture
+def mixed_data():
+    rng = np.random.default_rng(42)
+    n_runs = 1_000
+    inputs = pd.DataFrame(
+        {
+            "x": rng.random(n_runs),
+            "n": rng.integers(0, 10, n_runs),
+            "color": rng.choice(["red", "green", "blue"], n_runs),
+        }
+    )
+    output = inputs["x"] * inputs["n"] + (inputs["color"] == "red")
+    return inputs, output
+
+
+def test_numeric_columns_are_views():
+    inputs = np.random.default_rng(42).random((100, 3))
+
+    columns = _as_columns(inputs)
+    assert columns.names == ["x0", "x1", "x2"]
+    for i, column in enumerate(columns.data):
+        assert np.shares_memory(column, inputs)
+        npt.assert_equal(column, inputs[:, i])
+
+    frame = pd.DataFrame(inputs, columns=["a", "b", "c"])
+    columns = _as_columns(frame)
+    assert columns.names == ["a", "b", "c"]
+    for name, column in zip(columns.names, columns.data):
+        assert np.shares_memory(column, frame[name].to_numpy())
+
+
+def test_categorical_codes(mixed_data):
+    inputs, _ = mixed_data
+
+    columns = _as_columns(inputs)
+    assert list(columns.categories) == ["color"]
+    npt.assert_equal(
+        columns["color"], inputs["color"].astype("category").cat.codes.to_numpy()
+    )
+
+    columns = _as_columns(inputs, sort=False)
+    npt.assert_equal(columns["color"], pd.factorize(inputs["color"])[0])
+
+
+@pytest.mark.parametrize("library", ["pyarrow", "polars"])
+def test_tables(library, mixed_data):
+    inputs, output = mixed_data
+    lib = pytest.importorskip(library)
+    if library == "pyarrow":
+        table = lib.Table.from_pandas(inputs)
+        output_table = lib.table({"y": output.to_numpy()})
+    else:
+        table = lib.from_pandas(inputs)
+        output_table = lib.DataFrame({"y": output.to_numpy()})
+
+    columns = _as_columns(table)
+    expected = _as_columns(inputs)
+    assert columns.names == expected.names
+    for column, expected_column in zip(columns.data, expected.data):
+        npt.assert_equal(column, expected_column)
+
+    output_array, names = _as_output(output_table)
+    assert names == ["y"]
+    npt.assert_equal(output_array[:, 0], output.to_numpy())
+
+    res = sd.sensitivity_indices(inputs=table, output=output_table)
+    expected = sd.sensitivity_indices(inputs=inputs, output=output)
+    npt.assert_equal(res.si, expected.si)
+
+
+def test_decomposition_does_not_modify_inputs(mixed_data):
+    inputs, output = mixed_data
+    original = inputs.copy()
+
+    si = sd.sensitivity_indices(inputs=inputs, output=output).si
+    res = sd.decomposition(
+        inputs=inputs, output=output, sensitivity_indices=si, auto_ordering=False
+    )
+    pd.testing.assert_frame_equal(inputs, original)
+
+    # states are labelled from the untouched categorical column
+    states = sd.states_expansion(res.states, inputs[res.var_names])
+    assert sorted(states[2]) == ["blue", "green", "red"]
+
+
+@pytest.mark.parametrize("suffix", [".npy", ".arrow"])
+def test_files(suffix, stress_data, tmp_path):
+    inputs, output = stress_data
+    path_inputs = tmp_path / f"inputs{suffix}"
+    path_output = tmp_path / "output.npy"
+    np.save(path_output, output.to_numpy())
+    if suffix == ".npy":
+        np.save(path_inputs, inputs.to_numpy())
+    else:
+        pa = pytest.importorskip("pyarrow")
+        table = pa.Table.from_pandas(inputs)
+        with pa.OSFile(str(path_inputs), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                # several record batches, columns are chunked
+                for batch in table.to_batches(max_chunksize=1_000):
+                    writer.write_batch(batch)
+
+    columns = _as_columns(path_inputs)
+    assert columns.n_runs == len(inputs)
+    if suffix == ".npy":
+        # read-only views of the memory mapped file
+        assert not columns.data[0].flags.writeable
+
+    res = sd.sensitivity_indices(inputs=path_inputs, output=str(path_output))
+    expected = sd.sensitivity_indices(inputs=inputs, output=output)
+    npt.assert_allclose(res.si, expected.si)
+
+    res = sd.decomposition(
+        inputs=path_inputs, output=path_output, sensitivity_indices=expected.si
+    )
+    expected = sd.decomposition(
+        inputs=inputs, output=output, sensitivity_indices=expected.si
+    )
+    npt.assert_allclose(res.statistic, expected.statistic)
+
+    with pytest.raises(ValueError, match="only '.npy' and Arrow IPC"):
+        _as_columns(tmp_path / "inputs.csv")
+
+
+def test_take_is_lazy():
+    inputs = np.arange(20.0).reshape(10, 2)
+    accessed = []
+
+    columns = _as_columns(inputs)
+    columns.data = _LazyData(columns.data, lambda column: accessed.append(1) or column)
+    subset = columns.take(np.arange(10) % 2 == 0)
+
+    assert subset.n_runs == 5
+    assert accessed == []
+    npt.assert_equal(subset.select([1]).data[0], inputs[::2, 1])
+    assert len(accessed) == 1
@@ -0,0 +1,68 @@
+import tracemalloc
+
+import numpy as np
+
+import simdec as sd
+
+
+def test_sensitivity_indices_profile(stress_data):
+    inputs, output = stress_data
+
+    res = sd.sensitivity_indices(inputs=inputs, output=output)
+    assert res.profile is None
+
+    res = sd.sensitivity_indices(inputs=inputs, output=output, profile=True)
+    assert set(res.profile) == {
+        "input_conversion",
+        "first_order",
+        "second_order",
+        "total",
+    }
+    # each factor, and the pairs
+    assert res.profile["first_order"]["calls"] == 4
+    assert res.profile["second_order"]["calls"] == 5
+
+    total = res.profile["total"]
+    for stats in res.profile.values():
+        assert 0 < stats["wall_time"] <= total["wall_time"]
+        assert 0 <= stats["memory"] <= total["memory"]
+    # codes and binned statistics
+    assert res.profile["first_order"]["memory"] >= len(output)
+    assert not tracemalloc.is_tracing()
+
+
+def test_decomposition_profile(stress_data):
+    inputs, output = stress_data
+    si = np.array([0.04, 0.50, 0.11, 0.28])
+
+    res = sd.decomposition(
+        inputs=inputs, output=output, sensitivity_indices=si, profile=True
+    )
+    assert set(res.profile) == {
+        "input_conversion",
+        "bin_edges",
+        "scenarios",
+        "summary",
+        "total",
+    }
+    assert res.profile["scenarios"]["calls"] == 1
+
+
+def test_profile_hook(stress_data):
+    inputs, output = stress_data
+    profiles = []
+
+    sd.set_profile_hook(lambda name, profile: profiles.append((name, profile)))
+    try:
+        res = sd.sensitivity_indices(inputs=inputs, output=output)
+    finally:
+        sd.set_profile_hook(None)
+
+    assert len(profiles) == 1
+    name, profile = profiles[0]
+    assert name == "sensitivity_indices"
+    assert profile is res.profile
+
+    res = sd.sensitivity_indices(inputs=inputs, output=output)
+    assert res.profile is None
+    assert len(profiles) == 1
@@ -1,12 +1,15 @@
 import pathlib
+import sys
 
 import numpy as np
 import numpy.testing as npt
 import pandas as pd
 import pytest
+from scipy import stats
 from scipy.stats import qmc
 
 import simdec as sd
+from simdec.sensitivity_indices import _bin_codes, _bin_edges
 
 path_data = pathlib.Path(__file__).parent / "data"
 
@@ -16,6 +19,14 @@ def f_ishigami(x):
     return f_eval
 
 
+@pytest.fixture(autouse=True)
+def no_soe_cache():
+    # second-order effects are computed by each call being compared
+    sd.set_soe_cache(0)
+    yield
+    sd.set_soe_cache()
+
+
 @pytest.fixture(scope="session")
 def ishigami_ref_indices():
     """Reference values for Ishigami from Saltelli2007.
@@ -92,3 +103,257 @@ def test_sensitivity_indices_dataset(fname, foe_ref, si_ref):
 
     npt.assert_allclose(res.first_order, foe_ref, atol=5e-3)
     npt.assert_allclose(res.si, si_ref, atol=5e-2)
+
+
+@pytest.mark.parametrize("n_bins", [4, 10, 37])
+def test_bin_codes_match_scipy(n_bins):
+    rng = np.random.default_rng(2815)
+    x = np.concatenate([rng.normal(size=1000), [-1.0, 3.0]])
+
+    codes = _bin_codes(x, _bin_edges(x, n_bins))
+    binnumber = stats.binned_statistic(x, x, bins=n_bins).binnumber
+
+    npt.assert_array_equal(codes, binnumber - 1)
+
+
+def test_sensitivity_indices_multi_output():
+    data = pd.read_csv(path_data / "stress.csv")
+    output_name, *v_names = list(data.columns)
+    inputs = data[v_names]
+    outputs = pd.DataFrame(
+        {
+            "y0": data[output_name],
+            "y1": data[output_name] ** 2,
+            "y2": inputs.sum(axis=1),
+        }
+    )
+
+    res = sd.sensitivity_indices(inputs=inputs, output=outputs)
+
+    assert res.si.shape == (3, 4)
+    assert res.first_order.shape == (3, 4)
+    assert res.second_order.shape == (3, 4, 4)
+
+    for k, name in enumerate(outputs.columns):
+        res_k = sd.sensitivity_indices(inputs=inputs, output=outputs[name])
+        npt.assert_allclose(res.si[k], res_k.si, atol=1e-12)
+        npt.assert_allclose(res.first_order[k], res_k.first_order, atol=1e-12)
+        npt.assert_allclose(res.second_order[k], res_k.second_order, atol=1e-12)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_sensitivity_indices_n_jobs(executor):
+    data = pd.read_csv(path_data / "crying.csv")
+    output_name, *v_names = list(data.columns)
+    inputs, output = data[v_names], data[output_name]
+
+    res_ref = sd.sensitivity_indices(inputs=inputs, output=output)
+    res = sd.sensitivity_indices(
+        inputs=inputs, output=output, n_jobs=2, executor=executor
+    )
+
+    npt.assert_array_equal(res.second_order, res_ref.second_order)
+    npt.assert_array_equal(res.si, res_ref.si)
+
+
+@pytest.mark.parametrize("n_jobs", [0, -2])
+def test_sensitivity_indices_n_jobs_invalid(n_jobs):
+    data = pd.read_csv(path_data / "crying.csv")
+    output_name, *v_names = list(data.columns)
+    inputs, output = data[v_names], data[output_name]
+
+    with pytest.raises(ValueError, match="'n_jobs' must be a positive integer"):
+        sd.sensitivity_indices(inputs=inputs, output=output, n_jobs=n_jobs)
+
+
+def test_sensitivity_indices_bootstrap():
+    data = pd.read_csv(path_data / "stress.csv")
+    output_name, *v_names = list(data.columns)
+    inputs, output = data[v_names], data[output_name]
+
+    res = sd.sensitivity_indices(
+        inputs=inputs, output=output, n_bootstrap=200, rng=1923
+    )
+
+    assert res.si_ci.shape == (2, 4)
+    assert res.first_order_ci.shape == (2, 4)
+    assert res.second_order_ci.shape == (2, 4, 4)
+    assert np.all(res.si_ci[0] <= res.si_ci[1])
+
+    # intervals are around the point estimates and have a reasonable width
+    npt.assert_allclose(res.si_ci.mean(axis=0), res.si, atol=1e-2)
+    assert np.all(res.si_ci[1] - res.si_ci[0] < 0.05)
+
+    res_ = sd.sensitivity_indices(inputs=inputs, output=output)
+    assert res_.si_ci is None
+
+    # without pairs, the second-order intervals have zero width
+    for kwargs in [{"inputs": inputs[["R"]]}, {"inputs": inputs, "soe_top_k": 1}]:
+        res = sd.sensitivity_indices(output=output, n_bootstrap=20, rng=0, **kwargs)
+        assert np.all(res.si_ci[0] <= res.si_ci[1])
+        npt.assert_array_equal(res.second_order_ci[0], res.second_order_ci[1])
+
+
+def test_sensitivity_indices_soe_onehot():
+    data = pd.read_csv(path_data / "crying.csv")
+    output_name, *v_names = list(data.columns)
+    inputs, output = data[v_names], data[output_name]
+    outputs = np.column_stack([output, np.sqrt(output)])
+
+    for output_ in [output, outputs]:
+        res_ref = sd.sensitivity_indices(inputs=inputs, output=output_)
+        res = sd.sensitivity_indices(inputs=inputs, output=output_, soe_method="onehot")
+
+        npt.assert_allclose(res.second_order, res_ref.second_order, atol=1e-12)
+        npt.assert_allclose(res.si, res_ref.si, atol=1e-12)
+
+    # without pairs
+    for kwargs in [{"inputs": inputs.iloc[:, :1]}, {"inputs": inputs, "soe_top_k": 1}]:
+        res_ref = sd.sensitivity_indices(output=output, **kwargs)
+        res = sd.sensitivity_indices(output=output, soe_method="onehot", **kwargs)
+        npt.assert_array_equal(res.si, res_ref.si)
+
+
+def test_sensitivity_indices_soe_screening():
+    rng = np.random.default_rng(48151623)
+    inputs = rng.random((20_000, 6))
+    output = inputs[:, 0] + 2 * inputs[:, 1] * inputs[:, 2]
+
+    res_ref = sd.sensitivity_indices(inputs=inputs, output=output)
+    res = sd.sensitivity_indices(inputs=inputs, output=output, soe_threshold=0.05)
+
+    assert res_ref.skipped_pairs is None
+    npt.assert_array_equal(res.skipped_pairs[0], [0, 3])
+    assert len(res.skipped_pairs) == 15 - 3
+
+    for i, j in [(0, 1), (0, 2), (1, 2)]:
+        assert res.second_order[i, j] == res_ref.second_order[i, j]
+    for i, j in res.skipped_pairs:
+        assert res.second_order[i, j] == res.second_order[j, i] == 0
+    npt.assert_allclose(res.si, res_ref.si, atol=1e-2)
+
+    res = sd.sensitivity_indices(inputs=inputs, output=output, soe_top_k=3)
+    assert len(res.skipped_pairs) == 15 - 3
+
+
+def test_sensitivity_indices_soe_screening_bound():
+    rng = np.random.default_rng(48151623)
+    inputs = rng.random((20_000, 4))
+    # pure interaction without first-order effects
+    output = (inputs[:, 2] - 0.5) * (inputs[:, 3] - 0.5) + 0.1 * inputs[:, 0]
+
+    with pytest.warns(UserWarning, match="Skipped second-order effects"):
+        sd.sensitivity_indices(inputs=inputs, output=output, soe_top_k=2)
+
+
+def test_sensitivity_indices_time_budget():
+    rng = np.random.default_rng(48151623)
+    inputs = rng.random((20_000, 3))
+    output = inputs[:, 0] + 2 * inputs[:, 1] * inputs[:, 2]
+    res_ref = sd.sensitivity_indices(inputs=inputs, output=output)
+
+    # only the first subsample
+    res = sd.sensitivity_indices(inputs=inputs, output=output, time_budget=0, rng=0)
+    assert res.n_runs == 1024
+    assert res.si_uncertainty is None
+    npt.assert_allclose(res.si, res_ref.si, atol=0.1)
+
+    # up to all runs
+    res = sd.sensitivity_indices(
+        inputs=inputs, output=output, time_budget=60, rng=0, n_bootstrap=10
+    )
+    assert res.n_runs == 20_000
+    assert res.si_uncertainty.shape == (3,)
+    assert res.si_ci.shape == (2, 3)
+    npt.assert_allclose(res.si, res_ref.si)
+    assert res_ref.n_runs is None
+
+
+def test_sensitivity_indices_float32():
+    rng = np.random.default_rng(48151623)
+    inputs = rng.random((20_000, 3))
+    output = inputs[:, 0] + 2 * inputs[:, 1] * inputs[:, 2]
+    res_ref = sd.sensitivity_indices(inputs=inputs, output=output)
+
+    res = sd.sensitivity_indices(inputs=inputs, output=output, dtype="float32")
+    npt.assert_allclose(res.si, res_ref.si, atol=1e-5)
+
+    # single precision data are not promoted
+    res_32 = sd.sensitivity_indices(
+        inputs=inputs.astype(np.float32), output=output.astype(np.float32)
+    )
+    npt.assert_equal(res_32.si, res.si)
+
+    with pytest.raises(ValueError, match="'dtype' can only be"):
+        sd.sensitivity_indices(inputs=inputs, output=output, dtype="int32")
+
+
+def test_sensitivity_indices_domains(ishigami_ref_indices):
+    rng = np.random.default_rng(48151623)
+    inputs = qmc.Sobol(d=3, seed=rng).random(2**14)
+    inputs = qmc.scale(sample=inputs, l_bounds=[-np.pi] * 3, u_bounds=[np.pi] * 3)
+    output = f_ishigami(inputs.T)
+    res_ref = sd.sensitivity_indices(inputs=inputs, output=output)
+
+    res = sd.sensitivity_indices(
+        inputs=inputs, output=output, domains=[(-np.pi, np.pi)] * 3
+    )
+    npt.assert_allclose(res.si, res_ref.si, atol=5e-3)
+
+    # the CDF of a uniform distribution bins as its bounds
+    uniform = stats.uniform(loc=-np.pi, scale=2 * np.pi)
+    res_cdf = sd.sensitivity_indices(
+        inputs=inputs, output=output, domains={"x0": uniform, "x1": uniform}
+    )
+    npt.assert_allclose(res_cdf.si, res.si, atol=1e-3)
+
+    with pytest.raises(ValueError, match="unknown columns"):
+        sd.sensitivity_indices(inputs=inputs, output=output, domains={"a": (0, 1)})
+    with pytest.raises(ValueError, match="must be bounds"):
+        sd.sensitivity_indices(inputs=inputs, output=output, domains=[(1, 0)] * 3)
+    with pytest.raises(ValueError, match="within the bounds"):
+        sd.sensitivity_indices(inputs=inputs, output=output, domains=[(-np.pi, 3)] * 3)
+
+
+def test_sensitivity_indices_soe_cache(monkeypatch):
+    rng = np.random.default_rng(48151623)
+    inputs = rng.random((5_000, 7))
+    output = inputs[:, 0] + inputs[:, 1] * inputs[:, 2] + inputs[:, 5] * inputs[:, 6]
+    res_ref = sd.sensitivity_indices(inputs=inputs[:, :6], output=output)
+
+    module = sys.modules["simdec.sensitivity_indices"]
+    pair_conditional_vars = module._pair_conditional_vars
+    computed = []
+
+    def spy(codes, output, n_bins, pairs):
+        computed.append(len(pairs))
+        return pair_conditional_vars(codes, output, n_bins, pairs)
+
+    monkeypatch.setattr(module, "_pair_conditional_vars", spy)
+    sd.set_soe_cache()
+
+    res = sd.sensitivity_indices(inputs=inputs[:, :6], output=output)
+    assert computed == [15]
+    npt.assert_equal(res.second_order, res_ref.second_order)
+
+    # removing an input, all pairs are cached
+    res = sd.sensitivity_indices(inputs=inputs[:, :5], output=output)
+    assert computed == [15]
+    npt.assert_equal(res.second_order, res_ref.second_order[:5, :5])
+
+    # adding an input, only its pairs are computed
+    res = sd.sensitivity_indices(inputs=inputs, output=output)
+    assert computed == [15, 6]
+    npt.assert_equal(res.second_order[:6, :6], res_ref.second_order)
+
+    # other output
+    sd.sensitivity_indices(inputs=inputs, output=2 * output)
+    assert computed == [15, 6, 21]
+
+    # the bytes held are bounded, the least recently used pairs are evicted
+    cache = module._pair_cache
+    sd.set_soe_cache(5_000)
+    assert 0 < cache._size <= 5_000
+    assert len(cache._values) < 21
+    sd.sensitivity_indices(inputs=inputs, output=output)
+    assert 0 < cache._size <= 5_000
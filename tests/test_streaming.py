@@ -0,0 +1,203 @@
+import pathlib
+
+import numpy as np
+import numpy.testing as npt
+import pandas as pd
+import pytest
+
+import simdec as sd
+
+path_data = pathlib.Path(__file__).parent / "data"
+
+
+def test_sensitivity_indices_streaming(stress_data):
+    inputs, output = stress_data
+    chunks = [
+        (inputs.iloc[idx], output.iloc[idx])
+        for idx in np.array_split(np.arange(len(output)), 7)
+    ]
+
+    res = sd.sensitivity_indices_streaming(chunks)
+    res_ref = sd.sensitivity_indices(inputs=inputs, output=output)
+
+    npt.assert_allclose(res.si, res_ref.si, atol=1e-12)
+    npt.assert_allclose(res.first_order, res_ref.first_order, atol=1e-12)
+    npt.assert_allclose(res.second_order, res_ref.second_order, atol=1e-12)
+
+
+def test_sensitivity_indices_streaming_bounds(stress_data):
+    inputs, output = stress_data
+    bounds = list(zip(inputs.min(), inputs.max()))
+    chunks = (
+        (inputs.iloc[idx], output.iloc[idx])
+        for idx in np.array_split(np.arange(len(output)), 3)
+    )
+
+    res = sd.sensitivity_indices_streaming(chunks, bounds=bounds, n_runs=len(output))
+    res_ref = sd.sensitivity_indices(inputs=inputs, output=output)
+
+    npt.assert_allclose(res.si, res_ref.si, atol=1e-12)
+
+
+def test_sensitivity_indices_streaming_iterator(stress_data):
+    inputs, output = stress_data
+    chunks = iter([(inputs, output)])
+
+    with pytest.raises(ValueError, match="re-iterable"):
+        sd.sensitivity_indices_streaming(chunks)
+
+    with pytest.raises(ValueError, match="within the bounds"):
+        sd.sensitivity_indices_streaming(
+            [(inputs, output)], bounds=[(0, 1)] * 4, n_runs=len(output)
+        )
+    with pytest.raises(ValueError, match="does not contain any run"):
+        sd.sensitivity_indices_streaming([], bounds=[(0, 1)] * 4, n_runs=10)
+
+
+def test_sensitivity_statistics_merge(stress_data, tmp_path):
+    inputs, output = stress_data
+    bounds = list(zip(inputs.min(), inputs.max()))
+
+    shards = []
+    for k, idx in enumerate(np.array_split(np.arange(len(output)), 3)):
+        stats = sd.SensitivityStatistics.from_bounds(bounds, n_runs=len(output))
+        stats.update(inputs.iloc[idx], output.iloc[idx])
+        stats.save(tmp_path / f"shard_{k}.npz")
+        shards.append(sd.SensitivityStatistics.load(tmp_path / f"shard_{k}.npz"))
+
+    left = shards[0].merge(shards[1]).merge(shards[2])
+    right = shards[0].merge(shards[1].merge(shards[2]))
+    assert left.n_runs == right.n_runs == len(output)
+
+    res_ref = sd.sensitivity_indices(inputs=inputs, output=output)
+    for res in [left.result(), right.result()]:
+        npt.assert_allclose(res.si, res_ref.si, atol=1e-12)
+        npt.assert_allclose(res.second_order, res_ref.second_order, atol=1e-12)
+
+    other = sd.SensitivityStatistics.from_bounds(bounds, n_runs=10)
+    with pytest.raises(ValueError, match="identical bins"):
+        left.merge(other)
+
+
+def test_sensitivity_accumulator():
+    data = pd.read_csv(path_data / "crying.csv")
+    output_name, *v_names = list(data.columns)
+    inputs = data[v_names].select_dtypes("number").to_numpy()
+    output = data[output_name].to_numpy()
+    bounds = list(zip(inputs.min(axis=0), inputs.max(axis=0)))
+
+    acc = sd.SensitivityAccumulator(bounds=bounds)
+    for idx in np.array_split(np.arange(len(output)), 4):
+        res = acc.update(inputs[idx], output[idx]).result()
+        assert acc.n_runs == idx[-1] + 1
+
+    # (10, 4) bins divide the fine bins: same bins as the in-memory function
+    res_ref = sd.sensitivity_indices(inputs=inputs, output=output)
+    npt.assert_allclose(res.si, res_ref.si, atol=1e-12)
+    npt.assert_allclose(res.second_order, res_ref.second_order, atol=1e-12)
+
+
+def test_decomposition_streaming(stress_data):
+    inputs, output = stress_data
+    output = output.copy()
+    output.iloc[:3] = np.nan
+    si = np.array([0.04, 0.50, 0.11, 0.28])
+    chunks = [
+        (inputs.iloc[idx], output.iloc[idx])
+        for idx in np.array_split(np.arange(len(output)), 7)
+    ]
+
+    indexer = sd.ScenarioIndexer(dec_limit=1).fit(inputs, si)
+    res = sd.decomposition_streaming(chunks, indexer=indexer)
+    res_ref = sd.decomposition(inputs=inputs, output=output, indexer=indexer)
+    assert res.scenarios is None and res.output is None
+
+    npt.assert_allclose(res.statistic, res_ref.statistic, rtol=1e-12)
+    columns = ["count", "mean", "std", "min", "max"]
+    npt.assert_allclose(res.summary[columns], res_ref.summary[columns], rtol=1e-10)
+
+    # quantiles are interpolated in the histogram
+    counts, edges = res.histogram
+    assert counts.shape == (indexer.n_scenarios, 200)
+    assert counts.sum() == res_ref.summary["count"].sum()
+    width = edges[1] - edges[0]
+    for q in ["25%", "50%", "75%"]:
+        npt.assert_allclose(res.summary[q], res_ref.summary[q], atol=width)
+
+    res = sd.decomposition_streaming(chunks, indexer=indexer, statistic="median")
+    statistic = res.statistic.ravel()
+    valid = ~np.isnan(statistic)
+    assert valid.sum() == 13
+    npt.assert_allclose(statistic[valid], res.summary["50%"][valid])
+
+    with pytest.raises(ValueError, match="re-iterable"):
+        sd.decomposition_streaming(iter(chunks), indexer=indexer)
+
+
+def test_scenario_statistics_merge(stress_data, tmp_path):
+    inputs, output = stress_data
+    si = np.array([0.04, 0.50, 0.11, 0.28])
+    indexer = sd.ScenarioIndexer(dec_limit=1).fit(inputs, si)
+    output_edges = np.linspace(output.min(), output.max(), 51)
+
+    shards = []
+    for k, idx in enumerate(np.array_split(np.arange(len(output)), 3)):
+        stats = sd.ScenarioStatistics(indexer, output_edges)
+        stats.update(inputs.iloc[idx], output.iloc[idx])
+        stats.save(tmp_path / f"shard_{k}.npz")
+        shards.append(sd.ScenarioStatistics.load(tmp_path / f"shard_{k}.npz"))
+
+    left = shards[0].merge(shards[1]).merge(shards[2])
+    right = shards[0].merge(shards[1].merge(shards[2]))
+    expected = sd.ScenarioStatistics(indexer, output_edges).update(inputs, output)
+    assert left.n_runs == right.n_runs == len(output)
+
+    for stats in [left, right]:
+        npt.assert_equal(stats.histogram, expected.histogram)
+        pd.testing.assert_frame_equal(stats.summary(), expected.summary())
+
+    other = sd.ScenarioStatistics(indexer, output_edges[::2])
+    with pytest.raises(ValueError, match="identical scenarios and bins"):
+        left.merge(other)
+
+
+def test_scenario_statistics_save_categories(tmp_path):
+    rng = np.random.default_rng(42)
+    inputs = pd.DataFrame(
+        {"x": rng.random(1_000), "color": rng.choice(["red", "green", "blue"], 1_000)}
+    )
+    output = inputs["x"] + (inputs["color"] == "red")
+    indexer = sd.ScenarioIndexer(auto_ordering=False).fit(inputs, [0.5, 0.5])
+
+    stats = sd.ScenarioStatistics(indexer, np.linspace(0, 2, 21))
+    stats.update(inputs, output).save(tmp_path / "stats.npz")
+    loaded = sd.ScenarioStatistics.load(tmp_path / "stats.npz")
+
+    assert loaded.indexer.var_names == ["x", "color"]
+    pd.testing.assert_index_equal(
+        loaded.indexer.categories["color"], indexer.categories["color"]
+    )
+    npt.assert_equal(loaded.indexer.transform(inputs), indexer.transform(inputs))
+    pd.testing.assert_frame_equal(loaded.summary(), stats.summary())
+
+    # the loaded statistics keep accumulating on the same scenarios
+    merged = loaded.merge(stats)
+    npt.assert_equal(merged.counts, 2 * stats.counts)
+
+
+def test_scenario_statistics_save_bool_categories(tmp_path):
+    rng = np.random.default_rng(42)
+    inputs = pd.DataFrame({"x": rng.random(1_000), "flag": rng.random(1_000) > 0.5})
+    output = inputs["x"] + inputs["flag"]
+    indexer = sd.ScenarioIndexer(auto_ordering=False).fit(inputs, [0.5, 0.5])
+
+    stats = sd.ScenarioStatistics(indexer, np.linspace(0, 2, 21))
+    stats.update(inputs, output).save(tmp_path / "stats.npz")
+    loaded = sd.ScenarioStatistics.load(tmp_path / "stats.npz")
+
+    pd.testing.assert_index_equal(
+        loaded.indexer.categories["flag"], indexer.categories["flag"]
+    )
+    loaded.update(inputs, output)
+    assert loaded.n_runs == 2 * len(output)
+    npt.assert_equal(loaded.counts, 2 * stats.counts)
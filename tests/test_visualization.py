@@ -3,6 +3,7 @@ import pytest
 
 import matplotlib.pyplot as plt
 import numpy as np
+import numpy.testing as npt
 import pandas as pd
 
 import simdec as sd
@@ -335,3 +336,104 @@ def test_two_output_scatter_hue_order_is_ascending(stress_results):
     bins.columns = pd.RangeIndex(start=n, stop=0, step=-1)
     hue_order = sorted(pd.melt(bins)["variable"].unique())
     assert hue_order == list(range(1, n + 1))
+
+
+@pytest.mark.parametrize("kind", ["histogram", "boxplot"])
+def test_visualization_scenarios(stress_results, kind):
+    """Plotting from the scenarios of the runs draws the same plot as the bins."""
+    palette = sd.palette(stress_results.states)
+
+    ax_bins = sd.visualization(
+        bins=stress_results.bins.copy(), palette=palette, kind=kind
+    )
+    _, ax = plt.subplots()
+    ax = sd.visualization(decomposition=stress_results, palette=palette, kind=kind)
+
+    assert len(ax.patches) == len(ax_bins.patches)
+    for patch, patch_bins in zip(ax.patches, ax_bins.patches):
+        assert patch.get_facecolor() == patch_bins.get_facecolor()
+        np.testing.assert_allclose(
+            patch.get_path().vertices, patch_bins.get_path().vertices
+        )
+
+    with pytest.raises(ValueError, match="'bins' or 'decomposition'"):
+        sd.visualization(palette=palette, kind=kind)
+
+
+def test_tableau_scenarios(stress_results):
+    res = stress_results
+    palette = sd.palette(states=res.states)[::-1]
+    kwargs = dict(var_names=res.var_names, statistic=res.statistic, states=res.states)
+
+    table, _ = sd.tableau(**kwargs, palette=palette, decomposition=res)
+    expected, _ = sd.tableau(**kwargs, bins=res.bins, palette=palette)
+    pd.testing.assert_frame_equal(table, expected, check_dtype=False)
+
+
+def test_two_output_visualization_scenarios():
+    data = pd.read_csv(path_data / "stress.csv")
+    output_name, *v_names = list(data.columns)
+    inputs, output = data[v_names], data[output_name]
+    res = sd.decomposition(
+        inputs=inputs,
+        output=np.column_stack([output, output**2]),
+        sensitivity_indices=np.array([0.04, 0.50, 0.11, 0.28]),
+        dec_limit=1,
+    )
+    palette = sd.palette(res.states)[::-1]
+
+    fig, axs = sd.two_output_visualization(decomposition=res, palette=palette)
+    fig_bins, axs_bins = sd.two_output_visualization(
+        bins=res.select_output(0).bins,
+        bins2=res.select_output(1).bins,
+        palette=palette,
+    )
+    for ax, ax_bins in zip(axs.flat, axs_bins.flat):
+        assert len(ax.patches) == len(ax_bins.patches)
+        for patch, patch_bins in zip(ax.patches, ax_bins.patches):
+            assert patch.get_facecolor() == patch_bins.get_facecolor()
+
+    with pytest.raises(ValueError, match="'decomposition' of two outputs"):
+        sd.two_output_visualization(palette=palette, decomposition=res.select_output(0))
+
+    # a single output is plotted or tabulated
+    with pytest.raises(ValueError, match="several outputs"):
+        sd.visualization(decomposition=res, palette=palette)
+    with pytest.raises(ValueError, match="select_output"):
+        sd.tableau(
+            var_names=res.var_names,
+            statistic=res.statistic,
+            states=res.states,
+            palette=palette,
+            decomposition=res,
+        )
+
+
+def test_visualization_streaming():
+    fname = path_data / "stress.csv"
+    data = pd.read_csv(fname)
+    output_name, *v_names = list(data.columns)
+    inputs, output = data[v_names], data[output_name]
+    si = np.array([0.04, 0.50, 0.11, 0.28])
+
+    indexer = sd.ScenarioIndexer(dec_limit=1).fit(inputs, si)
+    res = sd.decomposition_streaming([(inputs, output)], indexer=indexer)
+    colors = sd.palette(states=res.states)
+
+    ax = sd.visualization(decomposition=res, palette=colors)
+    heights = sum(patch.get_height() for patch in ax.patches)
+    npt.assert_allclose(heights, 1)
+
+    table, _ = sd.tableau(
+        var_names=res.var_names,
+        statistic=res.statistic,
+        states=res.states,
+        palette=colors,
+        decomposition=res,
+    )
+    npt.assert_allclose(table["probability"].sum(), 1)
+
+    with pytest.raises(ValueError, match="requires the runs"):
+        sd.visualization(decomposition=res, palette=colors, kind="boxplot")
+    with pytest.raises(ValueError, match="require the runs"):
+        res.bins